@@ -3,6 +3,8 @@ import struct
 import base64
 from typing import List, Union
 
+import numpy as np
+
 
 class GaloisRingElement:
    
@@ -69,9 +71,75 @@ class GaloisRingElement:
 
         return GaloisRingElement(product[:self.D])
 
+    # x^64 + x^4 + x^3 + x + 1 over F_2, as a bit mask
+    _F2_MODULUS = (1 << 64) | 0b11011
+
+    @staticmethod
+    def _f2_mul(a: int, b: int) -> int:
+        res = 0
+        while b:
+            if b & 1:
+                res ^= a
+            a <<= 1
+            b >>= 1
+        return res
+
+    @staticmethod
+    def _f2_divmod(a: int, b: int):
+        q = 0
+        db = b.bit_length()
+        while a.bit_length() >= db:
+            shift = a.bit_length() - db
+            q ^= 1 << shift
+            a ^= b << shift
+        return q, a
+
     @classmethod
-    def random(cls) -> 'GaloisRingElement':
-        rand_coeffs = [secrets.randbits(cls.K) for _ in range(cls.D)]
+    def _f2_inverse(cls, a: int) -> int:
+        # extended Euclid in F_2[x] gives the inverse mod 2
+        r0, r1 = cls._F2_MODULUS, a
+        s0, s1 = 0, 1
+        while r1:
+            q, r = cls._f2_divmod(r0, r1)
+            r0, r1 = r1, r
+            s0, s1 = s1, s0 ^ cls._f2_mul(q, s1)
+        return s0
+
+    def _f2_bits(self) -> int:
+        return sum((c & 1) << i for i, c in enumerate(self.coeffs))
+
+    def is_unit(self) -> bool:
+        # the residue field is F_2[x]/f, so units are exactly the elements nonzero mod 2
+        return self._f2_bits() != 0
+
+    def inverse(self) -> 'GaloisRingElement':
+        a = self._f2_bits()
+        if a == 0:
+            raise ZeroDivisionError("GaloisRingElement is not a unit")
+        inv_bits = self._f2_inverse(a)
+        y = GaloisRingElement([(inv_bits >> i) & 1 for i in range(self.D)])
+
+        # Newton lift y <- y * (2 - a*y): precision 1 -> 2 -> ... -> 64 bits
+        two = GaloisRingElement([2] + [0] * (self.D - 1))
+        for _ in range(6):
+            y = y * (two - self * y)
+        return y
+
+    @classmethod
+    def zero(cls) -> 'GaloisRingElement':
+        return cls([0] * cls.D)
+
+    @classmethod
+    def one(cls) -> 'GaloisRingElement':
+        return cls([1] + [0] * (cls.D - 1))
+
+    @classmethod
+    def random(cls, rng=None) -> 'GaloisRingElement':
+        """
+        rng: optional random.Random, for values several parties must derive identically.
+        """
+        bits = secrets.randbits if rng is None else rng.getrandbits
+        rand_coeffs = [bits(cls.K) for _ in range(cls.D)]
         return cls(rand_coeffs)
 
     def to_string(self) -> str:
@@ -94,6 +162,222 @@ class GaloisRingElement:
 
 
 
+class GaloisRingVector:
+    """
+    M elements of GR(2^64, 64) as an (M, 64) uint64 array, row i = coefficients
+    of element i. uint64 arithmetic wraps mod 2^64, so + - * are the ring
+    operations coefficient-wise; a product is 64 shifted multiply-adds into an
+    (M, 127) buffer and a reduction by x^64 = -(x^4 + x^3 + x + 1), all batched.
+    """
+    D = GaloisRingElement.D
+    _REDUCER = (0, 1, 3, 4)
+
+    def __init__(self, coeffs):
+        coeffs = np.asarray(coeffs, dtype=np.uint64)
+        if coeffs.ndim != 2 or coeffs.shape[1] != self.D:
+            raise ValueError(f"Expected an (M, {self.D}) coefficient array")
+        self.coeffs = coeffs
+
+    @classmethod
+    def from_list(cls, elements: List[GaloisRingElement]) -> 'GaloisRingVector':
+        if not elements:
+            return cls.zeros(0)
+        return cls(np.array([e.coeffs for e in elements], dtype=np.uint64))
+
+    def to_list(self) -> List[GaloisRingElement]:
+        return [GaloisRingElement(row) for row in self.coeffs.tolist()]
+
+    @classmethod
+    def zeros(cls, n: int) -> 'GaloisRingVector':
+        return cls(np.zeros((n, cls.D), dtype=np.uint64))
+
+    @classmethod
+    def full(cls, n: int, element: GaloisRingElement) -> 'GaloisRingVector':
+        return cls(np.tile(np.array(element.coeffs, dtype=np.uint64), (n, 1)))
+
+    @classmethod
+    def random(cls, n: int, rng=None) -> 'GaloisRingVector':
+        return cls.from_list([GaloisRingElement.random(rng) for _ in range(n)])
+
+    def __len__(self):
+        return self.coeffs.shape[0]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice) or isinstance(i, np.ndarray) or isinstance(i, list):
+            return GaloisRingVector(self.coeffs[i])
+        return GaloisRingElement(self.coeffs[i].tolist())
+
+    def __iter__(self):
+        for row in self.coeffs.tolist():
+            yield GaloisRingElement(row)
+
+    def _operand(self, other) -> np.ndarray:
+        if isinstance(other, GaloisRingVector):
+            return other.coeffs
+        if isinstance(other, GaloisRingElement):
+            return np.array(other.coeffs, dtype=np.uint64)[None, :]
+        if isinstance(other, (int, np.integer)):
+            # an integer is the constant element c + 0x + ... + 0x^63
+            row = np.zeros((1, self.D), dtype=np.uint64)
+            row[0, 0] = int(other) & GaloisRingElement.MOD_MASK
+            return row
+        return NotImplemented
+
+    def __add__(self, other):
+        o = self._operand(other)
+        if o is NotImplemented:
+            return o
+        return GaloisRingVector(self.coeffs + o)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        o = self._operand(other)
+        if o is NotImplemented:
+            return o
+        return GaloisRingVector(self.coeffs - o)
+
+    def __rsub__(self, other):
+        o = self._operand(other)
+        if o is NotImplemented:
+            return o
+        return GaloisRingVector(o - self.coeffs)
+
+    def __neg__(self):
+        return GaloisRingVector(np.zeros_like(self.coeffs) - self.coeffs)
+
+    @classmethod
+    def _reduce(cls, prod: np.ndarray) -> np.ndarray:
+        """
+        (M, 2D - 1) product coefficients -> (M, D), in place on prod.
+        """
+        D = cls.D
+        top = prod.shape[1]
+        # fold x^D..x^(top-1) down; the x^3, x^4 terms spill over x^D again, so repeat
+        while top > D:
+            high = prod[:, D:top].copy()
+            prod[:, D:top] = 0
+            for r in cls._REDUCER:
+                prod[:, r:r + top - D] -= high
+            top = top - D + cls._REDUCER[-1]
+        return prod[:, :D]
+
+    @classmethod
+    def mul_arrays(cls, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Row-wise product of (M, D) / (1, D) coefficient arrays, broadcasting a single row.
+        """
+        D = cls.D
+        M = max(a.shape[0], b.shape[0])
+        prod = np.zeros((M, 2 * D - 1), dtype=np.uint64)
+        for i in range(D):
+            prod[:, i:i + D] += a[:, i:i + 1] * b
+        return cls._reduce(prod)
+
+    def __mul__(self, other):
+        if isinstance(other, (int, np.integer)):
+            # a constant scales every coefficient, no convolution needed
+            return GaloisRingVector(self.coeffs * np.uint64(int(other) & GaloisRingElement.MOD_MASK))
+        o = self._operand(other)
+        if o is NotImplemented:
+            return o
+        return GaloisRingVector(self.mul_arrays(self.coeffs, o))
+
+    _LIMB = 16
+    _CHUNK = 1 << 20
+
+    @classmethod
+    def _outer_sum(cls, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        O[i, j] = sum_m a_m[i] b_m[j] mod 2^64, on float64 BLAS: operands split
+        into 16-bit limbs, so every limb product is < 2^32 and a sum over 2^20
+        rows stays below 2^53, exact. Limb pairs shifted past 2^64 are skipped,
+        10 matmuls in all. NumPy's own uint64 matmul has no BLAS path and slows
+        down sharply for long vectors.
+        """
+        D, w = cls.D, cls._LIMB
+        mask = np.uint64((1 << w) - 1)
+        out = np.zeros(a.shape[:-2] + (D, D), dtype=np.uint64)
+        limbs = 64 // w
+        for start in range(0, a.shape[-2], cls._CHUNK):
+            A = a[..., start:start + cls._CHUNK, :]
+            B = b[..., start:start + cls._CHUNK, :]
+            a_limbs = [np.swapaxes((A >> np.uint64(w * k)) & mask, -1, -2).astype(np.float64) for k in range(limbs)]
+            b_limbs = [((B >> np.uint64(w * k)) & mask).astype(np.float64) for k in range(limbs)]
+            for i in range(limbs):
+                for j in range(limbs - i):
+                    out += np.matmul(a_limbs[i], b_limbs[j]).astype(np.uint64) << np.uint64(w * (i + j))
+        return out
+
+    @classmethod
+    def convolve_sum(cls, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        (..., M, D) x (..., M, D) -> (..., 2D - 1): sum_m of the unreduced products
+        a_m * b_m. The anti-diagonals of the outer-product sum O are the product
+        coefficients.
+        """
+        D = cls.D
+        outer = cls._outer_sum(a, b)
+        prod = np.zeros(outer.shape[:-2] + (2 * D - 1,), dtype=np.uint64)
+        for i in range(D):
+            prod[..., i:i + D] += outer[..., i, :]
+        return prod
+
+    @classmethod
+    def dot_arrays(cls, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Inner products of (..., M, D) batches with a single reduction per result.
+        """
+        prod = cls.convolve_sum(a, b)
+        lead = prod.shape[:-1]
+        return cls._reduce(prod.reshape(-1, 2 * cls.D - 1))[:, :cls.D].reshape(lead + (cls.D,))
+
+    def dot(self, other: 'GaloisRingVector') -> GaloisRingElement:
+        if len(self) != len(other):
+            raise ValueError("Vector lengths mismatch")
+        return GaloisRingElement(self.dot_arrays(self.coeffs, other.coeffs).tolist())
+
+    __rmul__ = __mul__
+
+    def sum(self) -> GaloisRingElement:
+        return GaloisRingElement(self.coeffs.sum(axis=0, dtype=np.uint64).tolist())
+
+    def units(self) -> np.ndarray:
+        """
+        Boolean mask of the entries that are units (nonzero mod 2).
+        """
+        return (self.coeffs & np.uint64(1)).any(axis=1)
+
+    def inverse(self) -> 'GaloisRingVector':
+        """
+        Entry-wise inverse: F_2 inverse per entry, then batched Newton lifts.
+        """
+        units = self.units()
+        if not units.all():
+            bad = np.flatnonzero(~units)
+            raise ZeroDivisionError(f"GaloisRingVector: non-units at indices {bad[:8].tolist()}")
+        bits = np.packbits((self.coeffs & np.uint64(1)).astype(np.uint8), axis=1, bitorder='little')
+        y = np.zeros_like(self.coeffs)
+        for k, row in enumerate(bits):
+            inv = GaloisRingElement._f2_inverse(int.from_bytes(row.tobytes(), 'little'))
+            y[k] = [(inv >> i) & 1 for i in range(self.D)]
+        two = np.zeros((1, self.D), dtype=np.uint64)
+        two[0, 0] = 2
+        for _ in range(6):
+            y = self.mul_arrays(y, two - self.mul_arrays(self.coeffs, y))
+        return GaloisRingVector(y)
+
+    def to_string(self) -> str:
+        return base64.b64encode(self.coeffs.astype('<u8').tobytes()).decode('utf-8')
+
+    @classmethod
+    def from_string(cls, s: str) -> 'GaloisRingVector':
+        flat = np.frombuffer(base64.b64decode(s), dtype='<u8').astype(np.uint64)
+        return cls(flat.reshape(-1, cls.D))
+
+
+
+
 
 if __name__ == "__main__":
     print("--- Testing Galois Ring (2^64, 64) ---")
@@ -128,3 +412,12 @@ if __name__ == "__main__":
     mul_res = a * b
     print("Multiplication check: Executed (Value verification omitted for random inputs)")
 
+    xs = [GaloisRingElement.random() for _ in range(5)]
+    ys = [GaloisRingElement.random() for _ in range(5)]
+    vx, vy = GaloisRingVector.from_list(xs), GaloisRingVector.from_list(ys)
+    assert [p.coeffs for p in (vx * vy)] == [(x * y).coeffs for x, y in zip(xs, ys)]
+    assert [p.coeffs for p in (vx * ys[0])] == [(x * ys[0]).coeffs for x in xs]
+    units = vx[np.flatnonzero(vx.units())]
+    assert all((u * v).coeffs == GaloisRingElement.one().coeffs for u, v in zip(units, units.inverse()))
+    assert GaloisRingVector.from_string(vx.to_string()).coeffs.tolist() == vx.coeffs.tolist()
+    print("Vector check: PASS")
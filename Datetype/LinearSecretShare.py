@@ -1,5 +1,12 @@
+import secrets
+from functools import reduce
+
 from Network.Party import *
 from Datetype.GR import *
+from Datetype.z2k import Z2kElement, Z2kVector
+from Datetype.mersenne61 import Mersenne61, Mersenne61Vector
+from utils.accumulator import Accumulator
+
 class ASSecretShare:
   
 
@@ -21,43 +28,183 @@ class ASSecretShare:
         raise NotImplementedError("type error")
 
     def __mul__(self, scalar):
-        if isinstance(scalar, int) or isinstance(scalar, GaloisRingElement):
-            return ASSecretShare(self.share * scalar)
-        elif isinstance(scalar, ASSecretShare):
+        # public scalar: int, ring element, or a vector of them for vector shares
+        if isinstance(scalar, ASSecretShare):
             raise TypeError("type error")
-        else:
+        res = self.share * scalar
+        if res is NotImplemented:
             raise TypeError("type error")
+        return ASSecretShare(res)
 
     def __rmul__(self, scalar):
         return self.__mul__(scalar)
 
+    def open(self, party: Party, round_id: int):
+        """
+        Broadcast this share in one message and add up everyone's: works for any
+        element or vector type with to_string / from_string.
+        """
+        party.broadcast(self.share.to_string(), round_id)
+        elem_type = type(self.share)
+        others = [elem_type.from_string(s) for s in party.receive_round(round_id).values()]
+        if elem_type in (GaloisRingElement, Z2kElement, Mersenne61):
+            # single elements: one reduction for the whole sum
+            acc = Accumulator(elem_type).add(self.share)
+            for x in others:
+                acc.add(x)
+            return acc.value()
+        # vectors already add as whole arrays
+        return reduce(lambda acc, x: acc + x, others, self.share)
+
+
+class ShareVector(ASSecretShare):
+    """
+    Additive share of a whole vector over one backend: GaloisRingVector,
+    Z2kVector or Mersenne61Vector. split / reconstruct work on all n shares at
+    once, open reconstructs over the network in one broadcast, and += -= *=
+    update the share's array in place (so do not apply them to a view of a
+    buffer that is still needed, such as a TripleStore slice).
+    """
+    BACKENDS = {GaloisRingElement: GaloisRingVector, Z2kElement: Z2kVector, Mersenne61: Mersenne61Vector}
+
+    def __init__(self, share):
+        if type(share) not in self.BACKENDS.values():
+            raise TypeError(f"unsupported share vector type {type(share).__name__}")
+        self.share = share
 
-class ASSProtocol:
+    def __len__(self):
+        return len(self.share)
 
-    @staticmethod
-    def share_secret(secret: GaloisRingElement, num_parties: int) -> List[GaloisRingElement]:
+    def __getitem__(self, idx):
+        item = self.share[idx]
+        return ShareVector(item) if type(item) in self.BACKENDS.values() else ASSecretShare(item)
+
+    @classmethod
+    def from_elements(cls, elements: list) -> 'ShareVector':
+        return cls(cls.BACKENDS[type(elements[0])].from_list(elements))
+
+    @classmethod
+    def zeros(cls, elem_type, n: int) -> 'ShareVector':
         """
-        x = x_1 + x_2 + ... + x_n
+        Share of the zero vector of length n, e.g. ShareVector.zeros(Mersenne61, n).
         """
-        shares = []
-        current_sum = GaloisRingElement.zero()
+        return cls(cls.BACKENDS[elem_type].zeros(n))
 
-        for _ in range(num_parties - 1):
-            r = GaloisRingElement.random()
-            shares.append(r)
-            current_sum = current_sum + r
+    @classmethod
+    def _random_like(cls, v, rng=None):
+        # without an rng, GR / Z2k draw from secrets; Mersenne61Vector would use `random`
+        if rng is None and isinstance(v, Mersenne61Vector):
+            rng = secrets.SystemRandom()
+        return type(v).random(len(v), rng)
 
-        last_share = secret - current_sum
-        shares.append(last_share)
+    @classmethod
+    def split(cls, secret, num_parties: int, rng=None) -> List['ShareVector']:
+        """
+        n - 1 random vectors and secret minus their sum.
+        """
+        shares = [cls._random_like(secret, rng) for _ in range(num_parties - 1)]
+        last = secret
+        for r in shares:
+            last = last - r
+        return [cls(v) for v in shares + [last]]
 
-        return shares
+    @staticmethod
+    def reconstruct(shares: List['ShareVector']):
+        return reduce(lambda acc, s: acc + s.share, shares[1:], shares[0].share)
 
     @staticmethod
-    def reconstruct(ASSecretShareList) -> GaloisRingElement:
-        reconstructed_secret = GaloisRingElement.zero()
-        for val in ASSecretShareList:
-            reconstructed_secret = reconstructed_secret + val
+    def _array_of(v):
+        return v.coeffs if isinstance(v, GaloisRingVector) else v.values
 
-        return reconstructed_secret
+    def _array(self):
+        return self._array_of(self.share)
 
+    def __iadd__(self, other):
+        o = other.share if isinstance(other, ASSecretShare) else other
+        if isinstance(self.share, Mersenne61Vector):
+            self.share.values[...] = (self.share + o).values
+        else:
+            np.add(self._array(), self.share._operand(o), out=self._array())
+        return self
+
+    def __isub__(self, other):
+        o = other.share if isinstance(other, ASSecretShare) else other
+        if isinstance(self.share, Mersenne61Vector):
+            self.share.values[...] = (self.share - o).values
+        else:
+            np.subtract(self._array(), self.share._operand(o), out=self._array())
+        return self
 
+    def __imul__(self, scalar):
+        if isinstance(self.share, Z2kVector):
+            np.multiply(self.share.values, self.share._operand(scalar), out=self.share.values)
+        else:
+            self._array()[...] = self._array_of(self.share * scalar)
+        return self
+
+    # ASSecretShare's binary operators, keeping the ShareVector type
+    def __add__(self, other):
+        return ShareVector(self.share + (other.share if isinstance(other, ASSecretShare) else other))
+
+    def __sub__(self, other):
+        return ShareVector(self.share - (other.share if isinstance(other, ASSecretShare) else other))
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, ASSecretShare):
+            raise TypeError("type error")
+        return ShareVector(self.share * scalar)
+
+
+class ASSProtocol:
+
+    @staticmethod
+    def share_secret(secret, num_parties: int) -> list:
+        """
+        x = x_1 + x_2 + ... + x_n, for a single element (GR, Z2k, Mersenne61) or a
+        whole vector of one backend (then the shares are ShareVector values).
+        """
+        if type(secret) in ShareVector.BACKENDS.values():
+            return [s.share for s in ShareVector.split(secret, num_parties)]
+        # an element is shared as a length-1 vector: same randomness as the vector path
+        shares = ShareVector.split(ShareVector.BACKENDS[type(secret)].from_list([secret]), num_parties)
+        return [s.share[0] for s in shares]
+
+    @staticmethod
+    def reconstruct(ASSecretShareList):
+        values = [s.share if isinstance(s, ASSecretShare) else s for s in ASSecretShareList]
+        return reduce(lambda acc, v: acc + v, values[1:], values[0])
+
+
+if __name__ == "__main__":
+    import random
+
+    def same(x, y):
+        return np.array_equal(ShareVector._array_of(x), ShareVector._array_of(y))
+
+    rng = random.Random(1)
+    for elem_type, backend in ShareVector.BACKENDS.items():
+        secret = backend.random(8, rng)
+        shares = ShareVector.split(secret, 4, rng)
+        assert same(ShareVector.reconstruct(shares), secret)
+        assert same(ShareVector.reconstruct(ShareVector.split(secret, 3)), secret)
+
+        # in place ops act on every share, so the secret follows
+        for s in shares:
+            s *= 3
+        shares[0] += ShareVector(secret)
+        assert same(ShareVector.reconstruct(shares), secret * 3 + secret)
+        for s in shares:
+            s -= s
+        assert same(ShareVector.reconstruct(shares), ShareVector.zeros(elem_type, 8).share)
+
+        doubled = [s * 2 + ShareVector(secret) for s in ShareVector.split(secret, 4, rng)]
+        assert same(ShareVector.reconstruct(doubled), secret * 2 + secret * 4)
+        assert same(ShareVector.reconstruct([s[[1, 5]] for s in ShareVector.split(secret, 4, rng)]), secret[[1, 5]])
+        print(f"ShareVector {backend.__name__} check: PASS")
+
+    for x in (GaloisRingElement.random(), Z2kElement.random(), Mersenne61.random()):
+        shares = ASSProtocol.share_secret(x, 4)
+        assert all(type(s) is type(x) for s in shares)
+        r = ASSProtocol.reconstruct(shares)
+        assert r.coeffs == x.coeffs if isinstance(x, GaloisRingElement) else r == x
+    print("ASSProtocol element sharing check: PASS")
@@ -0,0 +1,631 @@
+import random
+import struct
+import base64
+from typing import List
+
+import numpy as np
+
+
+class Mersenne61:
+    MOD = (1 << 61) - 1
+
+    def __init__(self, value):
+        if isinstance(value, Mersenne61):
+            self.value = value.value
+        else:
+            self.value = int(value) % self.MOD
+
+    def __repr__(self):
+        return f"F({self.value})"
+
+    @staticmethod
+    def _value(other):
+        if isinstance(other, Mersenne61):
+            return other.value
+        if isinstance(other, (int, np.integer)):
+            return int(other)
+        return None
+
+    def __add__(self, other):
+        v = self._value(other)
+        if v is None:
+            return NotImplemented
+        return Mersenne61((self.value + v) % self.MOD)
+
+    def __sub__(self, other):
+        v = self._value(other)
+        if v is None:
+            return NotImplemented
+        return Mersenne61((self.value - v) % self.MOD)
+
+    def __mul__(self, other):
+        v = self._value(other)
+        if v is None:
+            return NotImplemented
+        return Mersenne61((self.value * v) % self.MOD)
+
+    def __neg__(self):
+        return Mersenne61(-self.value)
+
+    def __eq__(self, other):
+        v = self._value(other)
+        if v is None:
+            return NotImplemented
+        return self.value == v
+
+    def inverse(self):
+        return Mersenne61(pow(self.value, self.MOD - 2, self.MOD))
+
+    def to_string(self) -> str:
+        packed = struct.pack('<Q', self.value)
+        return base64.b64encode(packed).decode('utf-8')
+
+    @classmethod
+    def from_string(cls, s: str):
+        packed = base64.b64decode(s)
+        val = struct.unpack('<Q', packed)[0]
+        return cls(val)
+
+    @classmethod
+    def random(cls):
+        return cls(random.randint(0, cls.MOD - 1))
+
+    @classmethod
+    def zero(cls):
+        return cls(0)
+
+    @classmethod
+    def one(cls):
+        return cls(1)
+
+
+class Mersenne61Vector:
+    """
+    A vector over F_p, p = 2^61 - 1, stored as a uint64 array with every entry in [0, p).
+
+    Products never leave uint64: operands are split into 32-bit halves and the
+    partial products are folded with 2^61 = 1 (mod p), so reduction is
+    shift + add instead of a division.
+    """
+
+    MOD = Mersenne61.MOD
+    _P = np.uint64(MOD)
+    _MASK32 = np.uint64((1 << 32) - 1)
+    _MASK29 = np.uint64((1 << 29) - 1)
+
+    def __init__(self, values):
+        if isinstance(values, np.ndarray) and values.dtype == np.uint64:
+            self.values = self._reduce(values)
+        else:
+            self.values = np.array([int(v) % self.MOD for v in values], dtype=np.uint64)
+
+    @classmethod
+    def _wrap(cls, arr: np.ndarray) -> 'Mersenne61Vector':
+        # arr is already reduced
+        obj = cls.__new__(cls)
+        obj.values = arr
+        return obj
+
+    # ---- uint64 kernels, all inputs/outputs in [0, p) unless noted ----
+    @classmethod
+    def _reduce(cls, x: np.ndarray) -> np.ndarray:
+        # any uint64 -> [0, p)
+        y = (x & cls._P) + (x >> np.uint64(61))
+        return np.where(y >= cls._P, y - cls._P, y)
+
+    @classmethod
+    def _add(cls, a, b):
+        s = a + b
+        return np.where(s >= cls._P, s - cls._P, s)
+
+    @classmethod
+    def _sub(cls, a, b):
+        s = a + (cls._P - b)
+        return np.where(s >= cls._P, s - cls._P, s)
+
+    @classmethod
+    def _mul(cls, a, b):
+        a0, a1 = a & cls._MASK32, a >> np.uint64(32)
+        b0, b1 = b & cls._MASK32, b >> np.uint64(32)
+        lo = a0 * b0                    # < 2^64
+        mid = a0 * b1 + a1 * b0         # < 2^62
+        hi = a1 * b1                    # < 2^58
+        # hi*2^64 = hi*8, mid*2^32 = (mid >> 29) + (mid & (2^29-1)) << 32, all mod p
+        t = (hi << np.uint64(3)) + (mid >> np.uint64(29)) + ((mid & cls._MASK29) << np.uint64(32))
+        t = t + (lo & cls._P) + (lo >> np.uint64(61))
+        return cls._reduce(t)
+
+    @classmethod
+    def _sum(cls, a) -> int:
+        lo = int(np.sum(a & cls._MASK32, dtype=np.uint64))
+        hi = int(np.sum(a >> np.uint64(32), dtype=np.uint64))
+        return (lo + (hi << 32)) % cls.MOD
+
+    @classmethod
+    def _operand(cls, other):
+        if isinstance(other, Mersenne61Vector):
+            return other.values
+        if isinstance(other, Mersenne61):
+            return np.uint64(other.value)
+        if isinstance(other, (int, np.integer)):
+            return np.uint64(int(other) % cls.MOD)
+        return None
+
+    # ---- constructors ----
+    @classmethod
+    def zeros(cls, n: int) -> 'Mersenne61Vector':
+        return cls._wrap(np.zeros(n, dtype=np.uint64))
+
+    @classmethod
+    def full(cls, n: int, value) -> 'Mersenne61Vector':
+        return cls._wrap(np.full(n, Mersenne61(value).value, dtype=np.uint64))
+
+    @classmethod
+    def random(cls, n: int, rng=None) -> 'Mersenne61Vector':
+        """
+        rng: optional random.Random; without it the draws come from `random`, so
+        preprocessing seeds keep working.
+        """
+        draw = random.randint if rng is None else rng.randint
+        return cls._wrap(np.array([draw(0, cls.MOD - 1) for _ in range(n)], dtype=np.uint64))
+
+    @classmethod
+    def from_list(cls, elems: List[Mersenne61]) -> 'Mersenne61Vector':
+        return cls._wrap(np.array([e.value for e in elems], dtype=np.uint64))
+
+    def to_list(self) -> List[Mersenne61]:
+        return [Mersenne61(int(v)) for v in self.values]
+
+    @classmethod
+    def powers(cls, x, n: int) -> 'Mersenne61Vector':
+        """
+        [1, x, ..., x^(n-1)] by doubling: block k..2k-1 is block 0..k-1 times x^k.
+        """
+        out = np.empty(n, dtype=np.uint64)
+        if n == 0:
+            return cls._wrap(out)
+        out[0] = 1
+        k = 1
+        step = np.uint64(Mersenne61(x).value)  # x^k
+        while k < n:
+            m = min(k, n - k)
+            out[k:k + m] = cls._mul(out[:m], step)
+            k += m
+            step = cls._mul(out[k - 1:k], np.uint64(Mersenne61(x).value))[0]
+        return cls._wrap(out)
+
+    # ---- container protocol ----
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (slice, list, np.ndarray)):
+            return self._wrap(self.values[idx])
+        return Mersenne61(int(self.values[idx]))
+
+    def __iter__(self):
+        for v in self.values:
+            yield Mersenne61(int(v))
+
+    def __repr__(self):
+        preview = ", ".join(str(int(v)) for v in self.values[:3])
+        return f"F^{len(self)}([{preview}, ...])"
+
+    def __eq__(self, other):
+        if not isinstance(other, Mersenne61Vector):
+            return NotImplemented
+        return np.array_equal(self.values, other.values)
+
+    # ---- arithmetic ----
+    def __add__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return self._wrap(self._add(self.values, v))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return self._wrap(self._sub(self.values, v))
+
+    def __rsub__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return self._wrap(self._sub(np.broadcast_to(v, self.values.shape), self.values))
+
+    def __mul__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return self._wrap(self._mul(self.values, v))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self._wrap(self._sub(np.zeros_like(self.values), self.values))
+
+    def sum(self) -> Mersenne61:
+        return Mersenne61(self._sum(self.values))
+
+    def dot(self, other: 'Mersenne61Vector') -> Mersenne61:
+        if len(self) != len(other):
+            raise ValueError("Vector lengths mismatch")
+        return Mersenne61(self._sum(self._mul(self.values, other.values)))
+
+    def evaluate(self, x) -> Mersenne61:
+        """
+        Treat the vector as coefficients c_0..c_{n-1} and return sum c_i x^i.
+        """
+        return self.dot(self.powers(x, len(self)))
+
+    def inverse(self) -> 'Mersenne61Vector':
+        """
+        Elementwise inverse with Montgomery's trick, organised as a product tree:
+        one pass up (n mults), one exponentiation at the root, one pass down (2n mults).
+        """
+        n = len(self)
+        if n == 0:
+            return self._wrap(self.values.copy())
+        if not np.all(self.values):
+            zeros = (self.values == 0).nonzero()[0]
+            raise ZeroDivisionError(f"Mersenne61Vector.inverse: zero entries at indices {zeros[:8].tolist()}")
+
+        size = 1 << (n - 1).bit_length()
+        level = np.ones(size, dtype=np.uint64)
+        level[:n] = self.values
+        tree = [level]
+        while len(level) > 1:
+            level = self._mul(level[0::2], level[1::2])
+            tree.append(level)
+
+        inv = np.array([pow(int(level[0]), self.MOD - 2, self.MOD)], dtype=np.uint64)
+        for children in reversed(tree[:-1]):
+            nxt = np.empty(len(children), dtype=np.uint64)
+            nxt[0::2] = self._mul(inv, children[1::2])
+            nxt[1::2] = self._mul(inv, children[0::2])
+            inv = nxt
+        return self._wrap(inv[:n])
+
+    # ---- serialization ----
+    def to_string(self) -> str:
+        return base64.b64encode(self.values.astype('<u8').tobytes()).decode('utf-8')
+
+    @classmethod
+    def from_string(cls, s: str) -> 'Mersenne61Vector':
+        packed = base64.b64decode(s)
+        if len(packed) % 8 != 0:
+            raise ValueError("Invalid string format for Mersenne61Vector")
+        return cls(np.frombuffer(packed, dtype='<u8').astype(np.uint64))
+
+
+class Mersenne61Ext:
+    """
+    F_{p^2} = F_p[i] / (i^2 + 1), p = 2^61 - 1 (p = 3 mod 4, so i^2 = -1 has no root in F_p).
+    p^2 - 1 = 2^62 * (2^60 - 1), so F_{p^2}^* has a subgroup of order 2^62 for NTTs.
+    """
+
+    MOD = Mersenne61.MOD
+    TWO_ADICITY = 62
+    _two_adic_generator = None
+
+    def __init__(self, re, im=0):
+        self.re = int(re.value if isinstance(re, Mersenne61) else re) % self.MOD
+        self.im = int(im.value if isinstance(im, Mersenne61) else im) % self.MOD
+
+    def __repr__(self):
+        return f"F2({self.re} + {self.im}i)"
+
+    @classmethod
+    def _coerce(cls, other):
+        if isinstance(other, Mersenne61Ext):
+            return other
+        if isinstance(other, (Mersenne61, int, np.integer)):
+            return cls(other)
+        return None
+
+    def __add__(self, other):
+        o = self._coerce(other)
+        if o is None:
+            return NotImplemented
+        return Mersenne61Ext(self.re + o.re, self.im + o.im)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        o = self._coerce(other)
+        if o is None:
+            return NotImplemented
+        return Mersenne61Ext(self.re - o.re, self.im - o.im)
+
+    def __rsub__(self, other):
+        o = self._coerce(other)
+        if o is None:
+            return NotImplemented
+        return o - self
+
+    def __mul__(self, other):
+        o = self._coerce(other)
+        if o is None:
+            return NotImplemented
+        return Mersenne61Ext(self.re * o.re - self.im * o.im, self.re * o.im + self.im * o.re)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Mersenne61Ext(-self.re, -self.im)
+
+    def __eq__(self, other):
+        o = self._coerce(other)
+        if o is None:
+            return NotImplemented
+        return self.re == o.re and self.im == o.im
+
+    def __pow__(self, e: int):
+        if e < 0:
+            return self.inverse() ** -e
+        result, base = Mersenne61Ext(1), self
+        while e:
+            if e & 1:
+                result = result * base
+            base = base * base
+            e >>= 1
+        return result
+
+    def inverse(self):
+        norm = (self.re * self.re + self.im * self.im) % self.MOD
+        if norm == 0:
+            raise ZeroDivisionError("Mersenne61Ext: zero has no inverse")
+        inv_norm = pow(norm, self.MOD - 2, self.MOD)
+        return Mersenne61Ext(self.re * inv_norm, -self.im * inv_norm)
+
+    @classmethod
+    def zero(cls):
+        return cls(0)
+
+    @classmethod
+    def one(cls):
+        return cls(1)
+
+    @classmethod
+    def root_of_unity(cls, n: int) -> 'Mersenne61Ext':
+        """
+        A primitive n-th root of unity, n a power of two up to 2^62.
+        """
+        if n <= 0 or n & (n - 1) or n > (1 << cls.TWO_ADICITY):
+            raise ValueError(f"No subgroup of order {n} in F_(p^2)")
+        if cls._two_adic_generator is None:
+            cofactor = (cls.MOD * cls.MOD - 1) >> cls.TWO_ADICITY
+            a = 1
+            while True:
+                g = cls(a, 1) ** cofactor
+                if g ** (1 << (cls.TWO_ADICITY - 1)) != cls.one():
+                    cls._two_adic_generator = g
+                    break
+                a += 1
+        return cls._two_adic_generator ** ((1 << cls.TWO_ADICITY) // n)
+
+
+class Mersenne61ExtVector:
+    """
+    A vector over F_{p^2}, kept as two uint64 arrays (real / imaginary parts).
+    Doubles as a coefficient vector for the radix-2 NTT over the 2^62 subgroup.
+    """
+
+    MOD = Mersenne61.MOD
+
+    def __init__(self, re, im=None):
+        re = re if isinstance(re, Mersenne61Vector) else Mersenne61Vector(re)
+        if im is None:
+            im = Mersenne61Vector.zeros(len(re))
+        elif not isinstance(im, Mersenne61Vector):
+            im = Mersenne61Vector(im)
+        if len(re) != len(im):
+            raise ValueError("Vector lengths mismatch")
+        self.re = re
+        self.im = im
+
+    @classmethod
+    def _from_arrays(cls, re: np.ndarray, im: np.ndarray) -> 'Mersenne61ExtVector':
+        return cls(Mersenne61Vector._wrap(re), Mersenne61Vector._wrap(im))
+
+    # F_{p^2} products on raw arrays
+    @staticmethod
+    def _mul_arrays(ar, ai, br, bi):
+        mul, add, sub = Mersenne61Vector._mul, Mersenne61Vector._add, Mersenne61Vector._sub
+        return sub(mul(ar, br), mul(ai, bi)), add(mul(ar, bi), mul(ai, br))
+
+    @classmethod
+    def _operand(cls, other):
+        if isinstance(other, Mersenne61ExtVector):
+            return other.re.values, other.im.values
+        if isinstance(other, Mersenne61Ext):
+            return np.uint64(other.re), np.uint64(other.im)
+        if isinstance(other, Mersenne61Vector):
+            return other.values, np.zeros_like(other.values)
+        if isinstance(other, (Mersenne61, int, np.integer)):
+            return np.uint64(Mersenne61(other).value), np.uint64(0)
+        return None
+
+    # ---- constructors ----
+    @classmethod
+    def zeros(cls, n: int) -> 'Mersenne61ExtVector':
+        return cls(Mersenne61Vector.zeros(n), Mersenne61Vector.zeros(n))
+
+    @classmethod
+    def powers(cls, x: Mersenne61Ext, n: int) -> 'Mersenne61ExtVector':
+        re = np.empty(n, dtype=np.uint64)
+        im = np.empty(n, dtype=np.uint64)
+        if n == 0:
+            return cls._from_arrays(re, im)
+        re[0], im[0] = 1, 0
+        k = 1
+        step = x  # x^k
+        while k < n:
+            m = min(k, n - k)
+            re[k:k + m], im[k:k + m] = cls._mul_arrays(re[:m], im[:m], np.uint64(step.re), np.uint64(step.im))
+            k += m
+            step = Mersenne61Ext(int(re[k - 1]), int(im[k - 1])) * x
+        return cls._from_arrays(re, im)
+
+    # ---- container protocol ----
+    def __len__(self):
+        return len(self.re)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return Mersenne61ExtVector(self.re[idx], self.im[idx])
+        return Mersenne61Ext(int(self.re.values[idx]), int(self.im.values[idx]))
+
+    def __repr__(self):
+        return f"F2^{len(self)}(re={self.re}, im={self.im})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Mersenne61ExtVector):
+            return NotImplemented
+        return self.re == other.re and self.im == other.im
+
+    # ---- arithmetic ----
+    def __add__(self, other):
+        o = self._operand(other)
+        if o is None:
+            return NotImplemented
+        return self._from_arrays(Mersenne61Vector._add(self.re.values, o[0]),
+                                 Mersenne61Vector._add(self.im.values, o[1]))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        o = self._operand(other)
+        if o is None:
+            return NotImplemented
+        return self._from_arrays(Mersenne61Vector._sub(self.re.values, o[0]),
+                                 Mersenne61Vector._sub(self.im.values, o[1]))
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        o = self._operand(other)
+        if o is None:
+            return NotImplemented
+        return self._from_arrays(*self._mul_arrays(self.re.values, self.im.values, o[0], o[1]))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Mersenne61ExtVector(-self.re, -self.im)
+
+    # ---- NTT over the 2-power subgroup ----
+    @classmethod
+    def _transform(cls, re: np.ndarray, im: np.ndarray, omega: Mersenne61Ext):
+        n = len(re)
+        bits = n.bit_length() - 1
+        rev = np.zeros(n, dtype=np.int64)
+        for b in range(bits):
+            rev |= ((np.arange(n) >> b) & 1) << (bits - 1 - b)
+        re, im = re[rev], im[rev]
+
+        tw = cls.powers(omega, max(n // 2, 1))
+        m = 1
+        while m < n:
+            stride = n // (2 * m)
+            w_re, w_im = tw.re.values[::stride][:m], tw.im.values[::stride][:m]
+            R, I = re.reshape(-1, 2, m), im.reshape(-1, 2, m)
+            v_re, v_im = cls._mul_arrays(R[:, 1, :], I[:, 1, :], w_re, w_im)
+            out_re, out_im = np.empty_like(R), np.empty_like(I)
+            out_re[:, 0, :] = Mersenne61Vector._add(R[:, 0, :], v_re)
+            out_im[:, 0, :] = Mersenne61Vector._add(I[:, 0, :], v_im)
+            out_re[:, 1, :] = Mersenne61Vector._sub(R[:, 0, :], v_re)
+            out_im[:, 1, :] = Mersenne61Vector._sub(I[:, 0, :], v_im)
+            re, im = out_re.reshape(n), out_im.reshape(n)
+            m *= 2
+        return re, im
+
+    def ntt(self, n: int = None) -> 'Mersenne61ExtVector':
+        """
+        Evaluate the polynomial with these coefficients on <omega_n> (omega_n^0, ..., omega_n^(n-1)).
+        The coefficient vector is zero-padded to n, a power of two.
+        """
+        n = n or len(self)
+        if len(self) > n:
+            raise ValueError("More coefficients than evaluation points")
+        re = np.zeros(n, dtype=np.uint64)
+        im = np.zeros(n, dtype=np.uint64)
+        re[:len(self)], im[:len(self)] = self.re.values, self.im.values
+        return self._from_arrays(*self._transform(re, im, Mersenne61Ext.root_of_unity(n)))
+
+    def intt(self) -> 'Mersenne61ExtVector':
+        """
+        Coefficients of the unique polynomial of degree < n taking these values on <omega_n>.
+        """
+        n = len(self)
+        omega_inv = Mersenne61Ext.root_of_unity(n).inverse()
+        re, im = self._transform(self.re.values, self.im.values, omega_inv)
+        return self._from_arrays(re, im) * Mersenne61(n).inverse()
+
+    def degree(self) -> int:
+        """
+        Degree of the polynomial with these coefficients (-1 for the zero polynomial).
+        """
+        nz = np.nonzero(self.re.values | self.im.values)[0]
+        return int(nz[-1]) if len(nz) else -1
+
+    # ---- serialization ----
+    def to_string(self) -> str:
+        raw = np.concatenate([self.re.values, self.im.values]).astype('<u8').tobytes()
+        return base64.b64encode(raw).decode('utf-8')
+
+    @classmethod
+    def from_string(cls, s: str) -> 'Mersenne61ExtVector':
+        packed = base64.b64decode(s)
+        if len(packed) % 16 != 0:
+            raise ValueError("Invalid string format for Mersenne61ExtVector")
+        arr = np.frombuffer(packed, dtype='<u8').astype(np.uint64)
+        half = len(arr) // 2
+        return cls(Mersenne61Vector(arr[:half]), Mersenne61Vector(arr[half:]))
+
+
+if __name__ == "__main__":
+    print("--- Testing Mersenne61Vector ---")
+    P = Mersenne61.MOD
+    xs = [random.randint(0, P - 1) for _ in range(1000)] + [0, 1, P - 1]
+    ys = [random.randint(0, P - 1) for _ in range(1000)] + [P - 1, P - 1, P - 1]
+    a, b = Mersenne61Vector(xs), Mersenne61Vector(ys)
+
+    assert [int(v) for v in (a + b).values] == [(x + y) % P for x, y in zip(xs, ys)]
+    assert [int(v) for v in (a - b).values] == [(x - y) % P for x, y in zip(xs, ys)]
+    assert [int(v) for v in (a * b).values] == [(x * y) % P for x, y in zip(xs, ys)]
+    assert [int(v) for v in (5 - a).values] == [(5 - x) % P for x in xs]
+    print("Arithmetic check: PASS")
+
+    assert a.dot(b).value == sum(x * y for x, y in zip(xs, ys)) % P
+    assert a.evaluate(7).value == sum(x * pow(7, i, P) for i, x in enumerate(xs)) % P
+    print("Dot / evaluation check: PASS")
+
+    inv = b.inverse()
+    assert all(v == 1 for v in (inv * b).values)
+    print("Batch inverse check: PASS")
+
+    assert Mersenne61Vector.from_string(a.to_string()) == a
+    print("Serialization check: PASS")
+
+    print("--- Testing NTT over F_(p^2) ---")
+    n = 64
+    w = Mersenne61Ext.root_of_unity(n)
+    assert w ** n == Mersenne61Ext.one() and w ** (n // 2) != Mersenne61Ext.one()
+    assert w ** -1 == w.inverse() and w ** -3 * w ** 3 == Mersenne61Ext.one()
+    coeffs = Mersenne61ExtVector(Mersenne61Vector.random(n - 3))
+    evals = coeffs.ntt(n)
+    for j in (0, 1, 17, n - 1):
+        x = w ** j
+        expected = Mersenne61Ext.zero()
+        for c in reversed([coeffs[k] for k in range(len(coeffs))]):
+            expected = expected * x + c
+        assert evals[j] == expected
+    back = evals.intt()
+    assert back.degree() == n - 4 and back[:n - 3] == coeffs
+    print("NTT / INTT check: PASS")
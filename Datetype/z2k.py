@@ -2,6 +2,7 @@ import secrets
 import struct
 import base64
 from typing import Union, Type
+import numpy as np
 from Datetype.GR import *
 
 class Z2kElement:
@@ -40,6 +41,26 @@ class Z2kElement:
             return self.value == (other & self.MOD_MASK)
         return self.value == other.value
 
+    def is_unit(self) -> bool:
+        return (self.value & 1) == 1
+
+    def inverse(self) -> 'Z2kElement':
+        if not self.is_unit():
+            raise ZeroDivisionError(f"Z2kElement {self.value} is not a unit")
+        # odd a: a * a = 1 mod 8, then each Newton step doubles the correct bits
+        x = self.value
+        for _ in range(5):
+            x = (x * (2 - self.value * x)) & self.MOD_MASK
+        return Z2kElement(x)
+
+    @classmethod
+    def zero(cls) -> 'Z2kElement':
+        return cls(0)
+
+    @classmethod
+    def one(cls) -> 'Z2kElement':
+        return cls(1)
+
     @classmethod
     def random(cls) -> 'Z2kElement':
         return cls(secrets.randbits(cls.K))
@@ -58,6 +79,20 @@ class Z2kElement:
         except struct.error:
             raise ValueError("Invalid string format for Z2kElement")
 
+    @staticmethod
+    def pack(elements: List['Z2kElement'], k: int = None) -> List['GaloisRingElement']:
+        """
+        k values per GR element (RMFE.MAX_K by default), see RMFE.
+        """
+        return RMFE(k).encode(Z2kVector.from_list(elements)).to_list()
+
+    @staticmethod
+    def unpack_product(packed: List['GaloisRingElement'], n: int, k: int = None) -> List['Z2kElement']:
+        """
+        The n componentwise products held by products of packed elements.
+        """
+        return RMFE(k).decode_product(GaloisRingVector.from_list(packed), n).to_list()
+
     def to_galois_ring(self, gr_class) -> 'GaloisRingElement':
         coeffs = [0] * gr_class.D
         # 将常数项设为当前值
@@ -65,6 +100,209 @@ class Z2kElement:
         return gr_class(coeffs)
 
 
+class Z2kVector:
+    """
+    A vector over Z_2^64 stored as a uint64 array: NumPy arithmetic already
+    wraps mod 2^64, so + - * need no masking at all.
+
+    to_galois_ring / from_galois_ring move whole batches in and out of column 0
+    of a GaloisRingVector. Scalars (int, Z2kElement) broadcast, so the vector
+    drops into ASSecretShare like a single element.
+    """
+    K = Z2kElement.K
+
+    def __init__(self, values):
+        if isinstance(values, np.ndarray) and values.dtype == np.uint64:
+            self.values = values
+        else:
+            self.values = np.array([int(v) & Z2kElement.MOD_MASK for v in values], dtype=np.uint64)
+
+    @classmethod
+    def _operand(cls, other):
+        if isinstance(other, Z2kVector):
+            return other.values
+        if isinstance(other, Z2kElement):
+            return np.uint64(other.value)
+        if isinstance(other, (int, np.integer)):
+            return np.uint64(int(other) & Z2kElement.MOD_MASK)
+        return None
+
+    @classmethod
+    def zeros(cls, n: int) -> 'Z2kVector':
+        return cls(np.zeros(n, dtype=np.uint64))
+
+    @classmethod
+    def full(cls, n: int, value) -> 'Z2kVector':
+        return cls(np.full(n, cls._operand(value), dtype=np.uint64))
+
+    @classmethod
+    def random(cls, n: int, rng=None) -> 'Z2kVector':
+        if rng is not None:
+            return cls(np.array([rng.getrandbits(cls.K) for _ in range(n)], dtype=np.uint64))
+        return cls(np.frombuffer(secrets.token_bytes(8 * n), dtype='<u8').astype(np.uint64))
+
+    @classmethod
+    def from_list(cls, elems: List[Z2kElement]) -> 'Z2kVector':
+        return cls(np.array([e.value for e in elems], dtype=np.uint64))
+
+    def to_list(self) -> List[Z2kElement]:
+        return [Z2kElement(v) for v in self.values.tolist()]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (slice, list, np.ndarray)):
+            return Z2kVector(self.values[idx])
+        return Z2kElement(int(self.values[idx]))
+
+    def __iter__(self):
+        for v in self.values.tolist():
+            yield Z2kElement(v)
+
+    def __repr__(self):
+        preview = ", ".join(str(v) for v in self.values[:3].tolist())
+        return f"Z2k^{len(self)}([{preview}, ...])"
+
+    def __eq__(self, other):
+        if not isinstance(other, Z2kVector):
+            return NotImplemented
+        return np.array_equal(self.values, other.values)
+
+    def __add__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return Z2kVector(self.values + v)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return Z2kVector(self.values - v)
+
+    def __rsub__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return Z2kVector(v - self.values)
+
+    def __mul__(self, other):
+        v = self._operand(other)
+        if v is None:
+            return NotImplemented
+        return Z2kVector(self.values * v)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Z2kVector(np.zeros_like(self.values) - self.values)
+
+    def sum(self) -> Z2kElement:
+        return Z2kElement(int(self.values.sum(dtype=np.uint64)))
+
+    def dot(self, other: 'Z2kVector') -> Z2kElement:
+        if len(self) != len(other):
+            raise ValueError("Vector lengths mismatch")
+        return Z2kElement(int((self.values * other.values).sum(dtype=np.uint64)))
+
+    def units(self) -> np.ndarray:
+        return (self.values & np.uint64(1)).astype(bool)
+
+    def inverse(self) -> 'Z2kVector':
+        """
+        Entry-wise inverse by the same Newton iteration as Z2kElement, batched.
+        """
+        if not self.units().all():
+            bad = np.flatnonzero(~self.units())
+            raise ZeroDivisionError(f"Z2kVector.inverse: even entries at indices {bad[:8].tolist()}")
+        x = self.values.copy()
+        for _ in range(5):
+            x = x * (np.uint64(2) - self.values * x)
+        return Z2kVector(x)
+
+    def to_galois_ring(self) -> GaloisRingVector:
+        out = np.zeros((len(self), GaloisRingElement.D), dtype=np.uint64)
+        out[:, 0] = self.values
+        return GaloisRingVector(out)
+
+    @classmethod
+    def from_galois_ring(cls, v: GaloisRingVector) -> 'Z2kVector':
+        """
+        Constant terms of a batch of GR elements (the inverse of to_galois_ring).
+        """
+        return cls(v.coeffs[:, 0].copy())
+
+    def pack(self, k: int = None) -> GaloisRingVector:
+        return RMFE(k).encode(self)
+
+    @classmethod
+    def unpack(cls, packed: GaloisRingVector, n: int = None, k: int = None, product: bool = False) -> 'Z2kVector':
+        rmfe = RMFE(k)
+        return rmfe.decode_product(packed, n) if product else rmfe.decode(packed, n)
+
+    def to_string(self) -> str:
+        return base64.b64encode(self.values.astype('<u8').tobytes()).decode('utf-8')
+
+    @classmethod
+    def from_string(cls, s: str) -> 'Z2kVector':
+        packed = base64.b64decode(s)
+        if len(packed) % 8 != 0:
+            raise ValueError("Invalid string format for Z2kVector")
+        return cls(np.frombuffer(packed, dtype='<u8').astype(np.uint64))
+
+
+class RMFE:
+    """
+    Reverse multiplication friendly embedding (Z_2^64)^k -> GR(2^64, 64):
+
+        encode: a -> sum_i a_i X^(e_i)
+        decode_product: z -> (z_(2 e_i))_i
+
+    With every e_i <= 31 a product of two encodings has degree < 64, so nothing
+    is reduced, and its X^(2 e_i) coefficient is sum_{e_j + e_l = 2 e_i} a_j b_l.
+    That is a_i b_i exactly when no e_i is the midpoint of two others, i.e. the
+    exponents have no 3-term progression; the largest such subset of 0..31 has
+    13 elements. Both maps are Z_2^64-linear, so sums of products (Beaver, inner
+    products) decode too. A product must be decoded and re-encoded before the
+    next multiplication.
+
+    One GR multiplication thus carries 13 Z_2^64 products instead of 1.
+    """
+    EXPONENTS = (0, 1, 3, 7, 8, 10, 18, 21, 22, 25, 27, 30, 31)
+    MAX_K = len(EXPONENTS)
+
+    def __init__(self, k: int = None):
+        k = k or self.MAX_K
+        if not 1 <= k <= self.MAX_K:
+            raise ValueError(f"RMFE packs at most {self.MAX_K} values per GR element")
+        self.k = k
+        self.slots = np.array(self.EXPONENTS[:k])
+
+    def encode(self, values: Z2kVector) -> GaloisRingVector:
+        n = len(values)
+        rows = -(-n // self.k)
+        flat = np.zeros(rows * self.k, dtype=np.uint64)
+        flat[:n] = values.values
+        out = np.zeros((rows, GaloisRingElement.D), dtype=np.uint64)
+        out[:, self.slots] = flat.reshape(rows, self.k)
+        return GaloisRingVector(out)
+
+    def _read(self, packed: GaloisRingVector, positions, n) -> Z2kVector:
+        flat = packed.coeffs[:, positions].reshape(-1)
+        return Z2kVector(flat[:len(flat) if n is None else n].copy())
+
+    def decode(self, packed: GaloisRingVector, n: int = None) -> Z2kVector:
+        """
+        Inverse of encode (on linear combinations of encodings).
+        """
+        return self._read(packed, self.slots, n)
+
+    def decode_product(self, packed: GaloisRingVector, n: int = None) -> Z2kVector:
+        return self._read(packed, 2 * self.slots, n)
+
 
 if __name__ == "__main__":
    
@@ -94,3 +332,24 @@ if __name__ == "__main__":
     assert len(gr_elem.coeffs) == 64
 
     print("Conversion to GR check: PASS")
+
+    v = Z2kVector.random(1000)
+    w = Z2kVector.random(1000)
+    assert ((v * w) - v).to_list()[7] == (v[7] * w[7]) - v[7]
+    assert v.dot(w) == sum((a.value * b.value for a, b in zip(v, w))) & Z2kElement.MOD_MASK
+    assert Z2kVector.from_string(v.to_string()) == v
+    assert Z2kVector.from_galois_ring(v.to_galois_ring()) == v
+    assert v.to_galois_ring()[3].coeffs == v[3].to_galois_ring(GaloisRingElement).coeffs
+    odd = Z2kVector(v.values | np.uint64(1))
+    assert (odd * odd.inverse()) == Z2kVector.full(1000, 1)
+    print("Z2kVector check: PASS")
+
+    packed_v, packed_w = v.pack(), w.pack()
+    assert Z2kVector.unpack(packed_v, len(v)) == v
+    assert Z2kVector.unpack(packed_v * packed_w, len(v), product=True) == v * w
+    dots = packed_v * packed_w + packed_w * packed_w
+    assert Z2kVector.unpack(dots, len(v), product=True) == v * w + w * w
+    zs = Z2kElement.unpack_product([x * y for x, y in zip(Z2kElement.pack(v.to_list()[:20]),
+                                                          Z2kElement.pack(w.to_list()[:20]))], 20)
+    assert zs == (v * w).to_list()[:20]
+    print(f"RMFE check: PASS ({RMFE.MAX_K} products per GR multiplication)")
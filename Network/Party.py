@@ -32,6 +32,10 @@ class Party:
 
         self._fragment_buffer = {}
 
+        # traffic counters (UDP payload bytes, fragments included)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
         print(f"[*] Party {self.node_id} listening on {self.port}")
 
     def _send_raw_bytes(self, target_id, data_bytes):
@@ -39,6 +43,7 @@ class Party:
         target_port = NODE_MAP[target_id]
         try:
             self.sock.sendto(data_bytes, ('127.0.0.1', target_port))
+            self.bytes_sent += len(data_bytes)
         except BlockingIOError:
             pass
         except OSError as e:
@@ -121,6 +126,9 @@ class Party:
 
             return msg, True
 
+    def traffic(self):
+        return {'sent': self.bytes_sent, 'received': self.bytes_received}
+
     def barrier(self):
 
         print(f"[{self.node_id}] Waiting at barrier...")
@@ -153,6 +161,16 @@ class Party:
         for pid in self.peers:
             self._send_packet(pid, payload)
 
+    def send_private(self, target_id, value, round_id):
+
+        payload = {
+            't': 'DATA',
+            'r': round_id,
+            'src': self.node_id,
+            'val': value
+        }
+        self._send_packet(target_id, payload)
+
     def receive_round(self, round_id, expected_senders=None):
 
         received = {}
@@ -166,13 +184,17 @@ class Party:
         for pid in wait_list:
             key = (round_id, pid)
             if key in self._msg_buffer:
-                received[pid] = self._msg_buffer.pop(key)
+                # FIFO per (round, sender): several messages may share a round id
+                received[pid] = self._msg_buffer[key].pop(0)
+                if not self._msg_buffer[key]:
+                    del self._msg_buffer[key]
 
         while len(received) < len(wait_list):
             ready, _, _ = select.select([self.sock], [], [], 1.0)
             if ready:
                 try:
                     data, _ = self.sock.recvfrom(65535)
+                    self.bytes_received += len(data)
 
 
                     msg, is_complete = self._handle_recv_data(data)
@@ -182,12 +204,12 @@ class Party:
                         src = msg.get('src')
                         val = msg.get('val')
 
-                        if r_in == round_id:
-                            if src in wait_list and src not in received:
-                                received[src] = val
-                        elif r_in is not None and r_in > round_id:
-
-                            self._msg_buffer[(r_in, src)] = val
+                        if r_in == round_id and src in wait_list and src not in received:
+                            received[src] = val
+                        elif r_in is not None and r_in >= round_id:
+                            # later round, this round from a peer not waited on yet, or a
+                            # further message of this round from a peer already heard from
+                            self._msg_buffer.setdefault((r_in, src), []).append(val)
 
                 except Exception as e:
                     print(f"Error processing packet: {e}")
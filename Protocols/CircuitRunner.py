@@ -0,0 +1,313 @@
+import sys
+import os
+import time
+import random
+import hashlib
+import secrets
+from typing import Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from Network.Party import Party
+from Datetype.GR import GaloisRingElement, GaloisRingVector
+from Protocols.mac_pure import AuthenticatedShare
+from utils.Circuit import Circuit
+from utils.accumulator import Accumulator
+
+
+def _const(x: int) -> GaloisRingElement:
+    """
+    Z_2^64 value as a constant of GR(2^64, 64).
+    """
+    return GaloisRingElement([x] + [0] * (GaloisRingElement.D - 1))
+
+
+def _pack(elements: List[GaloisRingElement]) -> str:
+    return "|".join(e.to_string() for e in elements)
+
+
+def _unpack(msg: str) -> List[GaloisRingElement]:
+    return [GaloisRingElement.from_string(s) for s in msg.split("|")] if msg else []
+
+
+class SimulatedDealer:
+    """
+    Preprocessing from a trusted dealer that every party simulates from a common
+    seed, keeping only its own shares. It stands in for the VOLE/OLE offline
+    phase, so the online phase can be benchmarked on its own.
+
+    Triples and input masks are drawn from Z_2^64 (constants of the ring); the
+    value and MAC shares are full GR elements, the MAC key is a full GR element.
+    Constant operands go on the left of '*', where GaloisRingElement skips zeros.
+    """
+
+    def __init__(self, node_id: int, num_parties: int, seed: int = 0):
+        self.node_id = node_id
+        self.num_parties = num_parties
+        self.rng = random.Random(seed)
+        self._alpha = GaloisRingElement.random(self.rng)
+        self.alpha_share = self._split(self._alpha)
+
+    def _split(self, x: GaloisRingElement) -> GaloisRingElement:
+        shares = [GaloisRingElement.random(self.rng) for _ in range(self.num_parties - 1)]
+        last = x
+        for s in shares:
+            last = last - s
+        shares.append(last)
+        return shares[self.node_id]
+
+    def _auth(self, x: GaloisRingElement) -> AuthenticatedShare:
+        return AuthenticatedShare(self._split(x), self._split(x * self._alpha))
+
+    def triples(self, n: int):
+        out = []
+        for _ in range(n):
+            a, b = _const(self.rng.getrandbits(64)), _const(self.rng.getrandbits(64))
+            out.append((self._auth(a), self._auth(b), self._auth(a * b)))
+        return out
+
+    def input_masks(self, owners: List[int]):
+        """
+        ([r_w], r_w if this party owns wire w else None) for every input wire.
+        """
+        out = []
+        for owner in owners:
+            r = _const(self.rng.getrandbits(64))
+            out.append((self._auth(r), r if owner == self.node_id else None))
+        return out
+
+
+class CircuitRunner:
+    """
+    Evaluates a Bristol arithmetic circuit (ADD/MUL over Z_2^64) on authenticated
+    GR shares.
+
+    - inputs: the owner broadcasts x - r for its preprocessed mask [r]
+    - ADD: local
+    - MUL: one Beaver round per multiplicative layer (CircuitSchedule), all
+      e = x - a, d = y - b of the layer in a single message
+    - outputs: opened together, then a single batched MAC check over every
+      value opened in the run (random linear combination, commit-then-open)
+
+    Per-layer wall time and traffic are kept in self.layer_stats.
+    """
+
+    def __init__(self, node_id: int, circuit: Circuit, num_parties: int = 4, seed: int = 0,
+                 input_owners: Optional[List[int]] = None):
+        self.node_id = node_id
+        self.num_parties = num_parties
+        self.circuit = circuit
+        self.schedule = circuit.schedule()
+        self.seed = seed
+        n_in = circuit.wire_input_num
+        # contiguous blocks of input wires per party by default
+        self.input_owners = input_owners or [i * num_parties // n_in for i in range(n_in)]
+        self.party = Party(node_id)
+        self.round_counter = 0
+        self.alpha_share = None
+        self._opened = []   # (public value, share) pairs waiting for the MAC check
+        self.layer_stats = []
+        self._layer_start = None    # (time, traffic) at the last layer mark
+
+    def _next_round(self):
+        self.round_counter += 1
+        return self.round_counter
+
+    def preprocessing_phase(self):
+        dealer = SimulatedDealer(self.node_id, self.num_parties, self.seed)
+        self.alpha_share = dealer.alpha_share
+        self.masks = dealer.input_masks(self.input_owners)
+        self.triples = dealer.triples(self.schedule.stats()['mul_gates'])
+        self._triple_pos = 0
+
+    def add_public(self, share: AuthenticatedShare, c: GaloisRingElement) -> AuthenticatedShare:
+        val = share.val + c if self.node_id == 0 else share.val
+        return AuthenticatedShare(val, share.mac + c * self.alpha_share)
+
+    def open_batch(self, shares: List[AuthenticatedShare]) -> List[GaloisRingElement]:
+        """
+        Open without checking; the values join the final MAC check.
+        """
+        rid = self._next_round()
+        self.party.broadcast(_pack([s.val for s in shares]), rid)
+        values = [s.val for s in shares]
+        for msg in self.party.receive_round(rid).values():
+            values = [v + w for v, w in zip(values, _unpack(msg))]
+        self._opened.extend(zip(values, shares))
+        return values
+
+    def input_phase(self, my_inputs: Dict[int, int]) -> List[AuthenticatedShare]:
+        rid = self._next_round()
+        mine = [w for w, owner in enumerate(self.input_owners) if owner == self.node_id]
+        self.party.broadcast(_pack([_const(my_inputs[w]) - self.masks[w][1] for w in mine]), rid)
+        received = self.party.receive_round(rid)
+
+        diffs = {}
+        for pid, msg in list(received.items()) + [(self.node_id, None)]:
+            wires = [w for w, owner in enumerate(self.input_owners) if owner == pid]
+            values = _unpack(msg) if msg is not None else \
+                [_const(my_inputs[w]) - self.masks[w][1] for w in mine]
+            diffs.update(zip(wires, values))
+        return [self.add_public(self.masks[w][0], diffs[w]) for w in range(len(self.input_owners))]
+
+    def mul_batch(self, xs: List[AuthenticatedShare], ys: List[AuthenticatedShare]) -> List[AuthenticatedShare]:
+        self._mark_layer()
+        n = len(xs)
+        triples = self.triples[self._triple_pos:self._triple_pos + n]
+        if len(triples) < n:
+            raise RuntimeError(f"Triple store exhausted: need {n}, {len(triples)} left")
+        self._triple_pos += n
+
+        opened = self.open_batch([x - a for x, (a, _, _) in zip(xs, triples)]
+                                 + [y - b for y, (_, b, _) in zip(ys, triples)])
+        es, ds = opened[:n], opened[n:]
+        zs = []
+        for (a, b, c), e, d in zip(triples, es, ds):
+            # e, d are constants: keep them on the left of '*'
+            z = c + AuthenticatedShare(e * b.val, e * b.mac) + AuthenticatedShare(d * a.val, d * a.mac)
+            zs.append(self.add_public(z, e * d))
+        return zs
+
+    def _mark_layer(self, label=None):
+        now, traffic = time.time(), self.party.traffic()
+        if self._layer_start is not None:
+            t0, tr0 = self._layer_start
+            self.layer_stats.append({
+                'layer': len(self.layer_stats) if label is None else label,
+                'time': now - t0,
+                'sent': traffic['sent'] - tr0['sent'],
+                'received': traffic['received'] - tr0['received'],
+            })
+        self._layer_start = (now, traffic)
+
+    def mac_check(self):
+        """
+        sum_j chi_j * (mac_j - alpha * y_j) = 0 over all opened y_j, with chi from
+        a joint coin drawn after the openings. Shares of the sum are committed
+        before they are revealed.
+        """
+        rid = self._next_round()
+        my_seed = secrets.token_hex(16)
+        self.party.broadcast(my_seed, rid)
+        seeds = self.party.receive_round(rid)
+        seeds[self.node_id] = my_seed
+        coin = hashlib.sha256("".join(seeds[p] for p in sorted(seeds)).encode()).digest()
+        rng = random.Random(coin)
+
+        chis = GaloisRingVector.random(len(self._opened), rng)
+        ys = GaloisRingVector.from_list([y for y, _ in self._opened])
+        macs = GaloisRingVector.from_list([share.mac for _, share in self._opened])
+        sigma = chis.dot(macs) - ys.dot(chis) * self.alpha_share
+
+        nonce = secrets.token_hex(16)
+        rid = self._next_round()
+        self.party.broadcast(hashlib.sha256((sigma.to_string() + nonce).encode()).hexdigest(), rid)
+        commits = self.party.receive_round(rid)
+        rid = self._next_round()
+        self.party.broadcast([sigma.to_string(), nonce], rid)
+        reveals = self.party.receive_round(rid)
+
+        total = Accumulator().add(sigma)
+        for pid, (s, n) in reveals.items():
+            if hashlib.sha256((s + n).encode()).hexdigest() != commits[pid]:
+                raise ValueError(f"[{self.node_id}] MAC Check: party {pid} opened a different commitment")
+            total.add(GaloisRingElement.from_string(s))
+        if any(total.value().coeffs):
+            raise ValueError(f"[{self.node_id}] MAC Check: FAILED!")
+        self._opened = []
+
+    def online_phase(self, my_inputs: Dict[int, int]) -> List[int]:
+        """
+        my_inputs: {input wire: value} for the wires this party owns.
+        Returns the circuit outputs as integers mod 2^64.
+        """
+        self.layer_stats = []
+        self._layer_start = None
+        self._mark_layer()
+        shares = self.input_phase(my_inputs)
+        zero = AuthenticatedShare(GaloisRingElement.zero(), GaloisRingElement.zero())
+        out_wires = list(range(self.circuit.wire_num - self.circuit.wire_output_num, self.circuit.wire_num))
+        outputs = self.schedule.evaluate(shares, lambda x, y: x + y, self.mul_batch, zero, outputs=out_wires)
+        self._mark_layer()
+
+        values = self.open_batch(outputs)
+        self.mac_check()
+        self._mark_layer("check")
+        return [v.coeffs[0] for v in values]
+
+    def report(self):
+        """
+        Rows: inputs and the linear gates before the first MUL (layer 0), one per
+        multiplicative layer, then output opening + MAC check.
+        """
+        print(f"[{self.node_id}] {'layer':>6} {'time(s)':>9} {'sent(B)':>10} {'recv(B)':>10}")
+        for row in self.layer_stats:
+            print(f"[{self.node_id}] {row['layer']:>6} {row['time']:>9.4f} {row['sent']:>10} {row['received']:>10}")
+        total = sum(row['time'] for row in self.layer_stats)
+        sent = sum(row['sent'] for row in self.layer_stats)
+        print(f"[{self.node_id}] {'total':>6} {total:>9.4f} {sent:>10}")
+
+
+TEST_CIRCUIT = "\n".join([
+    "7 15", "8", "1", "",
+    "2 1 0 1 8 MUL", "2 1 2 3 9 MUL", "2 1 8 9 10 ADD",
+    "2 1 4 5 11 MUL", "2 1 11 6 12 ADD", "2 1 10 12 13 MUL",
+    "2 1 13 7 14 MUL",
+])
+
+
+def random_circuit(n_gates: int = 3000, n_inputs: int = 8, n_outputs: int = 4, seed: int = 1) -> str:
+    """
+    Bristol text of a random ADD/MUL circuit: every gate reads two earlier wires
+    and the last n_outputs wires are the outputs. The default is the 3000-gate
+    circuit the runner is benchmarked on.
+    """
+    rng = random.Random(seed)
+    wires = list(range(n_inputs))
+    lines = []
+    for w in range(n_inputs, n_inputs + n_gates):
+        a, b = rng.choice(wires), rng.choice(wires)
+        lines.append(f"2 1 {a} {b} {w} {rng.choice(('ADD', 'MUL'))}")
+        wires.append(w)
+    return "\n".join([f"{n_gates} {n_inputs + n_gates}", f"{n_inputs}", f"{n_outputs}", ""] + lines) + "\n"
+
+
+def test():
+    """
+    python -c "from Protocols.CircuitRunner import test; test()" <node_id> [circuit name | small]
+
+    Without a circuit name it runs random_circuit(); "small" is TEST_CIRCUIT.
+    """
+    node_id = int(sys.argv[1])
+    name = sys.argv[2] if len(sys.argv) > 2 else None
+    if name is None:
+        circuit = Circuit(random_circuit(), False)
+    else:
+        circuit = Circuit(TEST_CIRCUIT, False) if name == "small" else Circuit(name)
+    runner = CircuitRunner(node_id, circuit, num_parties=4, seed=2024)
+    print(f"[{node_id}] Offline: {runner.schedule.stats()['mul_gates']} triples, "
+          f"depth {runner.schedule.depth}.")
+    runner.preprocessing_phase()
+
+    inputs = {w: w + 1 for w, owner in enumerate(runner.input_owners) if owner == node_id}
+    runner.party.barrier()
+    start_time = time.time()
+    try:
+        result = runner.online_phase(inputs)
+    except ValueError as e:
+        print(f"[{node_id}] \033[91mFAILED\033[0m: {e}")
+        return
+    end_time = time.time()
+
+    expected = [int(v) for v in circuit.evaluate_batch([[w + 1 for w in range(circuit.wire_input_num)]], 1 << 64)[0]]
+    runner.report()
+    if result == expected:
+        print(f"[{node_id}] \033[92mCHECK PASS\033[0m {result} in {end_time - start_time:.4f}s")
+    else:
+        print(f"[{node_id}] \033[91mCHECK FAIL\033[0m: {result} != {expected}")
+
+
+if __name__ == "__main__":
+    test()
@@ -3,9 +3,11 @@ import math
 import time
 from typing import List
 from Network.Party import Party
-from Datetype.GR import GaloisRingElement
+from Datetype.GR import GaloisRingElement, GaloisRingVector
 from Protocols.mac_pure import VOLEProtocol, AuthenticatedShare
 from Datetype.LinearSecretShare import ASSecretShare
+from utils.powers import power_table
+from utils.accumulator import Accumulator
 
 class OfflineProtocol:
     def __init__(self, node_id: int, num_parties: int):
@@ -30,13 +32,7 @@ class OfflineProtocol:
             return GaloisRingElement.from_string(data[0])
 
     def _reconstruct_secret(self, share_obj: ASSecretShare, round_id: int) -> GaloisRingElement:
-        my_val = share_obj.share
-        self.party.broadcast(my_val.to_string(), round_id)
-        shares_map = self.party.receive_round(round_id)
-        total = my_val
-        for pid, s_str in shares_map.items():
-            total = total + GaloisRingElement.from_string(s_str)
-        return total
+        return share_obj.open(self.party, round_id)
 
     def batch_vole_commit(self, vector_len: int, input_vector=None, src_id=0):
         commitments = []
@@ -165,10 +161,9 @@ class OnlineProtocol:
             return GaloisRingElement.from_string(data[0])
 
     def _local_dot(self, vec_a: List[GaloisRingElement], vec_b: List[GaloisRingElement]) -> GaloisRingElement:
-        res = GaloisRingElement([0] * 64)
-        for i in range(len(vec_a)):
-            res = res + (vec_a[i] * vec_b[i])
-        return res
+        if not isinstance(vec_a, GaloisRingVector):
+            vec_a, vec_b = GaloisRingVector.from_list(vec_a), GaloisRingVector.from_list(vec_b)
+        return vec_a.dot(vec_b)
 
     def run(self, a_shares: List[ASSecretShare], b_shares: List[ASSecretShare], c_share: ASSecretShare):
         try:
@@ -178,8 +173,8 @@ class OnlineProtocol:
 
             log_M = int(math.log2(M))
             print(f"[{self.node_id}] === Verification Start M={M} ===")
-            curr_a = [s.share for s in a_shares]
-            curr_b = [s.share for s in b_shares]
+            curr_a = GaloisRingVector.from_list([s.share for s in a_shares])
+            curr_b = GaloisRingVector.from_list([s.share for s in b_shares])
             curr_c = c_share.share
             history_data = []
             r_C = GaloisRingElement.random()
@@ -205,16 +200,8 @@ class OnlineProtocol:
                 w_L = one - r_j
                 w_R = r_j
 
-                next_a = []
-                next_b = []
-                for k in range(half_len):
-                    val_a = (a_L[k] * w_L) + (a_R[k] * w_R)
-                    next_a.append(val_a)
-                    val_b = (b_L[k] * w_L) + (b_R[k] * w_R)
-                    next_b.append(val_b)
-
-                curr_a = next_a
-                curr_b = next_b
+                curr_a = (a_L * w_L) + (a_R * w_R)
+                curr_b = (b_L * w_L) + (b_R * w_R)
                 curr_c = self._local_dot(curr_a, curr_b)
             A_final = curr_a[0]  # scalar
             B_final = curr_b[0]  # scalar
@@ -223,16 +210,13 @@ class OnlineProtocol:
 
             alpha = self._get_alpha()
 
-            C_hat = GaloisRingElement([0] * 64)
-            current_alpha_pow = alpha  # alpha^1 start
-            for item in history_data:
+            acc = Accumulator()
+            alpha_pows = power_table(alpha, len(history_data) + 1)  # alpha^1 start
+            for idx, item in enumerate(history_data):
                 term = item['c_curr'] - item['q_0'] - item['q_1']
-                weighted_term = term * current_alpha_pow
-                C_hat = C_hat + weighted_term
-
-                current_alpha_pow = current_alpha_pow * alpha
+                acc.add_product(term, alpha_pows[idx + 1])
 
-            C_hat = C_hat + C_final - r_C
+            C_hat = acc.add(C_final).sub(r_C).value()
 
             rid_chat = 5000
             self.party.broadcast(C_hat.to_string(), rid_chat)
@@ -1,69 +1,40 @@
 import sys
 import time
 import random
-import struct
-import base64
-from typing import List
+from typing import List, Union
 
-from Network.Party import Party
-from Datetype.LinearSecretShare import ASSecretShare
-
-class Mersenne61:
-    MOD = (1 << 61) - 1
-
-    def __init__(self, value):
-        if isinstance(value, Mersenne61):
-            self.value = value.value
-        else:
-            self.value = value % self.MOD
-
-    def __repr__(self):
-        return f"F({self.value})"
-
-    def __add__(self, other):
-        v = other.value if isinstance(other, Mersenne61) else other
-        return Mersenne61((self.value + v) % self.MOD)
-
-    def __sub__(self, other):
-        v = other.value if isinstance(other, Mersenne61) else other
-        return Mersenne61((self.value - v) % self.MOD)
-
-    def __mul__(self, other):
-        v = other.value if isinstance(other, Mersenne61) else other
-        return Mersenne61((self.value * v) % self.MOD)
-
-    def __neg__(self):
-        return Mersenne61(-self.value)
-
-    def __eq__(self, other):
-        v = other.value if isinstance(other, Mersenne61) else other
-        return self.value == v
-
-    def inverse(self):
-        return Mersenne61(pow(self.value, self.MOD - 2, self.MOD))
-
-    def to_string(self) -> str:
-        packed = struct.pack('<Q', self.value)
-        return base64.b64encode(packed).decode('utf-8')
-
-    @classmethod
-    def from_string(cls, s: str):
-        packed = base64.b64decode(s)
-        val = struct.unpack('<Q', packed)[0]
-        return cls(val)
-
-    @classmethod
-    def random(cls):
-        return cls(random.randint(0, cls.MOD - 1))
-
-    @classmethod
-    def zero(cls):
-        return cls(0)
-
-    @classmethod
-    def one(cls):
-        return cls(1)
+import numpy as np
 
+from Network.Party import Party
+from Datetype.LinearSecretShare import ASSecretShare, ShareVector
+from Datetype.mersenne61 import Mersenne61, Mersenne61Vector, Mersenne61Ext, Mersenne61ExtVector
+from utils.powers import power_table
+from utils.inversion import batch_inverse
+
+class TripleStore:
+    """
+    Beaver triples ([a], [b], [c = a * b]) produced in preprocessing, kept as three
+    vector shares and handed out in slices.
+
+    Like CircuitRunner's SimulatedDealer, every party runs the dealer from a common
+    seed and keeps only its own shares.
+    """
+
+    def __init__(self, size: int, node_id: int, num_parties: int, seed: int = 0):
+        rng = random.Random(seed)
+        a = Mersenne61Vector.random(size, rng)
+        b = Mersenne61Vector.random(size, rng)
+        self.a, self.b, self.c = (ASSecretShare(ShareVector.split(v, num_parties, rng)[node_id].share)
+                                  for v in (a, b, a * b))
+        self.size = size
+        self.used = 0
+
+    def take(self, n: int):
+        if self.used + n > self.size:
+            raise RuntimeError(f"Triple store exhausted: need {n}, {self.size - self.used} left")
+        sl = slice(self.used, self.used + n)
+        self.used += n
+        return ASSecretShare(self.a.share[sl]), ASSecretShare(self.b.share[sl]), ASSecretShare(self.c.share[sl])
 
 
 class LuArgProtocol:
@@ -76,20 +47,17 @@ class LuArgProtocol:
         self.d = 2 ** 8
         self.c = 1
 
-        self.omega_N = Mersenne61(3)
+        self.omega_N = Mersenne61Ext.root_of_unity(self.N)
         print(f"[{self.node_id}] Waiting for barrier...")
         self.party.barrier()
 
-    def secure_broadcast_reconstruct(self, share: ASSecretShare, round_id: int) -> Mersenne61:
-        self.party.broadcast(share.share.to_string(), round_id)
-        received = self.party.receive_round(round_id)
+    def secure_broadcast_reconstruct(self, share: ASSecretShare, round_id: int) -> Union[Mersenne61, Mersenne61Vector]:
+        return share.open(self.party, round_id)
 
-        total = share.share
-        for pid, val_str in received.items():
-            total = total + Mersenne61.from_string(val_str)
-        return total
-
-    def batch_reconstruct(self, shares: List[ASSecretShare], round_id: int) -> List[Mersenne61]:
+    def batch_reconstruct(self, shares: Union[List[ASSecretShare], ASSecretShare], round_id: int) -> Union[List[Mersenne61], Mersenne61Vector]:
+        # a vector share goes out as one array message
+        if isinstance(shares, ASSecretShare):
+            return self.secure_broadcast_reconstruct(shares, round_id)
 
         results = []
         payload = [s.share.to_string() for s in shares]
@@ -102,10 +70,11 @@ class LuArgProtocol:
             results.append(total)
         return results
 
-    def pi_mult(self, x: ASSecretShare, y: ASSecretShare, round_id: int) -> ASSecretShare:
-        a = ASSecretShare(Mersenne61.random())
-        b = ASSecretShare(Mersenne61.random())
-        c = ASSecretShare(Mersenne61.random())
+    def pi_mult_batch(self, x: ASSecretShare, y: ASSecretShare, round_id: int) -> ASSecretShare:
+        """
+        Elementwise product of two vector shares with one opening round for all e/d values.
+        """
+        a, b, c = self.triples.take(len(x.share))
 
         # Open e = x - a, d = y - b
         e_share = x - a
@@ -121,94 +90,135 @@ class LuArgProtocol:
         e_open = e_share.share
         d_open = d_share.share
         for pid, val in rec.items():
-            e_open = e_open + Mersenne61.from_string(val['e'])
-            d_open = d_open + Mersenne61.from_string(val['d'])
+            e_open = e_open + Mersenne61Vector.from_string(val['e'])
+            d_open = d_open + Mersenne61Vector.from_string(val['d'])
 
         #  z = c + e*b + d*a + e*d
-        term1 = c
-        term2 = b * e_open.value
-        term3 = a * d_open.value
-
-        res = term1 + term2 + term3
+        res = c + b * e_open + a * d_open
 
         if self.node_id == 0:
             # P0 adds constant
-            prod_val = e_open * d_open
-            res = res + ASSecretShare(prod_val)
+            res = res + ASSecretShare(e_open * d_open)
 
         return res
 
-    def preprocessing_phase(self):
+    def pi_mult(self, x: ASSecretShare, y: ASSecretShare, round_id: int) -> ASSecretShare:
+        z = self.pi_mult_batch(ASSecretShare(Mersenne61Vector.from_list([x.share])),
+                               ASSecretShare(Mersenne61Vector.from_list([y.share])), round_id)
+        return ASSecretShare(z.share[0])
+
+    def check_mult(self, n: int, round_id: int) -> bool:
+        """
+        Multiply two fresh random vector shares with pi_mult_batch and compare the
+        opened product to the product of the opened factors. Uses n triples.
+        """
+        x = ASSecretShare(Mersenne61Vector.random(n))
+        y = ASSecretShare(Mersenne61Vector.random(n))
+        z = self.pi_mult_batch(x, y, round_id)
+        x_open = self.secure_broadcast_reconstruct(x, round_id + 1)
+        y_open = self.secure_broadcast_reconstruct(y, round_id + 2)
+        z_open = self.secure_broadcast_reconstruct(z, round_id + 3)
+        return z_open == x_open * y_open
+
+    def _deal(self, secret) -> ASSecretShare:
+        """
+        This party's additive share of a dealer value (element or vector).
+        """
+        if isinstance(secret, Mersenne61):
+            return ASSecretShare(self._deal(Mersenne61Vector.from_list([secret])).share[0])
+        return ASSecretShare(ShareVector.split(secret, self.num_parties, self._dealer)[self.node_id].share)
+
+    def preprocessing_phase(self, extra_triples: int = 0):
+        # every party runs the dealer from the same seed and keeps only its own shares
         random.seed(0)
+        self._dealer = random.Random(0)
         self.alpha = Mersenne61.random()
-        self.beta_clear = Mersenne61.random()
-        self.xi_clear = Mersenne61.random()
-
-        self.t_vec = [Mersenne61.random() for _ in range(self.N)]
-        self.R_vals = [Mersenne61.random() for _ in range(self.N)]
-        self.hat_t = [self.t_vec[i] - self.R_vals[i] for i in range(self.N)]
 
-        self.beta_share = ASSecretShare(Mersenne61.random())
-        self.delta_share = ASSecretShare(Mersenne61.random())
-        self.gamma_share = ASSecretShare(Mersenne61.random())
-        self.xi_share = ASSecretShare(Mersenne61.random())
-        self.inv_xi_share = ASSecretShare(Mersenne61.random())
-
-        self.b_shares = [ASSecretShare(Mersenne61.random()) for _ in range(self.c)]
-        self.R_shares = [ASSecretShare(Mersenne61.random()) for _ in range(self.N)]
-        self.rho_coeffs = [ASSecretShare(Mersenne61.random()) for _ in range(self.N - 1)]
-        self.F_input_shares = [[ASSecretShare(Mersenne61.random()) for _ in range(self.d)] for _ in range(self.c)]
+        # public table masked by R: hat_t = t - R; lookup i hits t[lookup_idx[i]]
+        self.t_vec = Mersenne61Vector.random(self.N)
+        self.R_vals = Mersenne61Vector.random(self.N)
+        self.hat_t = self.t_vec - self.R_vals
+        self.lookup_idx = [random.randrange(self.N) for _ in range(self.c)]
+
+        self.beta_share = self._deal(Mersenne61.random())
+        self.delta_share = self._deal(Mersenne61.random())
+        self.gamma_share = self._deal(Mersenne61.random())
+        xi = Mersenne61.random()
+        self.xi_share = self._deal(xi)
+        self.inv_xi_share = self._deal(xi.inverse())
+
+        self.b_shares = self._deal(Mersenne61Vector.random(self.c))
+        self.R_shares = self._deal(self.R_vals)
+        self.rho_coeffs = self._deal(Mersenne61Vector.random(self.N - 1))
+
+        # F_i random except F_i0, set so that f_i = sum_k F_ik alpha^k is t[lookup_idx[i]]
+        alpha_pows = power_table(self.alpha, self.d)
+        self.F_input_shares = []
+        for idx in self.lookup_idx:
+            row = Mersenne61Vector.random(self.d)
+            row = row + Mersenne61Vector.from_list([self.t_vec[idx] - row.dot(alpha_pows)] + [Mersenne61.zero()] * (self.d - 1))
+            self.F_input_shares.append(self._deal(row))
+
+        # z = sum_k x^k: N at x = 1 and 0 on the rest of H, so c/N * sum_H z * B = B(1)
+        self.z_coeffs = Mersenne61Vector.full(self.N, 1)
+
+        # c triples for z = (f' + beta) * b, one for o = B(delta) * (F(delta) + beta)
+        self.triples = TripleStore(self.c + 1 + extra_triples, self.node_id, self.num_parties)
 
         random.seed(time.time())
 
-    def online_phase(self):
+    def online_phase(self, tamper: bool = False):
+        """
+        tamper: party 1 shifts its share of C_hat at one point of H, as a cheating
+        prover would; the step 11 degree check must then abort.
+        """
         print(f"[{self.node_id}] Starting Online Phase...")
 
         # <f> = sum <F_i> * alpha^i
         f_shares = []
+        alpha_pows = power_table(self.alpha, self.d)
         for i in range(self.c):
-            val = ASSecretShare(Mersenne61.zero())
-            current_alpha = Mersenne61.one()
-            row = self.F_input_shares[i]
-            for col_idx in range(self.d):
-                term = row[col_idx] * current_alpha.value
-                val = val + term
-                current_alpha = current_alpha * self.alpha
-            f_shares.append(val)
+            row = self.F_input_shares[i].share
+            f_shares.append(ASSecretShare(row.dot(alpha_pows)))
 
         # broadcast {[f_i] - [R_j]}
-        diff_shares = []
-        for j in range(self.N):
-            diff = f_shares[0] - self.R_shares[j]
-            diff_shares.append(diff)
+        diff_shares = ASSecretShare(Mersenne61Vector.full(self.N, f_shares[0].share)) - self.R_shares
 
         pi_m = self.batch_reconstruct(diff_shares, round_id=100)
 
-        f_prime_shares = f_shares
+        # f - R_j = hat_t_j exactly where f = t_j: that gives the multiplicities m_j and,
+        # at the hit k, the masked lookup value f' = f - R_k (so f' + beta = hat_t_k + beta)
+        hits = pi_m.values == self.hat_t.values
+        if not hits.any():
+            print(f"[{self.node_id}] \033[91mAbort: f is not in the table\033[0m")
+            return 0
+        m_vals = Mersenne61Vector._wrap(hits.astype(np.uint64))
+        k = int(np.argmax(hits))
+        f_prime_shares = [f - ASSecretShare(self.R_shares.share[k]) for f in f_shares]
         beta_open = self.secure_broadcast_reconstruct(self.beta_share, round_id=200)
 
-        A_values = []
-        for j in range(self.N):
-            denom = beta_open + self.hat_t[j]
-            if denom.value == 0: denom = Mersenne61(1)
-            val = pi_m[j] * denom.inverse()
-            A_values.append(val)
-        z_shares = []
-        for i in range(self.c):
-            term1 = f_prime_shares[i]
-            if self.node_id == 0:
-                term1 = term1 + ASSecretShare(beta_open)
+        # beta + t_j = 0 only if the challenge hits the table: abort instead of patching the entry
+        denom = self.hat_t + beta_open
+        try:
+            A_values = m_vals * batch_inverse(denom)
+        except ZeroDivisionError as e:
+            print(f"[{self.node_id}] \033[91mAbort: beta + t_j = 0 ({e})\033[0m")
+            return 0
+        # all c products in one round
+        term1 = ASSecretShare(Mersenne61Vector.from_list([f.share for f in f_prime_shares]))
+        if self.node_id == 0:
+            term1 = term1 + ASSecretShare(beta_open)
 
-            term2 = self.b_shares[i]
-            z = self.pi_mult(term1, term2, round_id=300 + i)
-            z_shares.append(z)
+        z_shares = self.pi_mult_batch(term1, self.b_shares, round_id=300)
 
         z_opens = self.batch_reconstruct(z_shares, round_id=400)
-        inv_f_beta_shares = []
-        for i in range(self.c):
-            inv_z = z_opens[i].inverse()
-            val = self.b_shares[i] * inv_z.value
-            inv_f_beta_shares.append(val)
+        try:
+            inv_zs = batch_inverse(z_opens)
+        except ZeroDivisionError as e:
+            print(f"[{self.node_id}] \033[91mAbort: opened z is zero ({e})\033[0m")
+            return 0
+        inv_f_beta = self.b_shares * inv_zs
+        inv_f_beta_shares = [ASSecretShare(v) for v in inv_f_beta.share]
 
         delta_open = self.secure_broadcast_reconstruct(self.delta_share, round_id=500)
 
@@ -235,46 +245,51 @@ class LuArgProtocol:
         if o_open.value != 1:
             print(f"[{self.node_id}] \033[93mStep 8 Check Failed: o != 1 (Got {o_open.value}). Ignoring...\033[0m")
 
-        C_plus_rho_evals = []
         c_over_N = Mersenne61(self.c) * Mersenne61(self.N).inverse()
 
-        for j in range(self.N):
-            x_val = self.omega_N
-            b_val = (inv_f_beta_shares[0] * x_val.value) + (self.xi_share * (Mersenne61.one() - x_val).value)
+        # B(x) = inv_f_beta * x + xi * (1 - x) = xi + (inv_f_beta - xi) * x on every point of H = <omega_N>
+        H = Mersenne61ExtVector.powers(self.omega_N, self.N)
+        B_slope = (inv_f_beta_shares[0] - self.xi_share).share
 
-            z_val = Mersenne61.random()
+        z_evals = Mersenne61ExtVector(self.z_coeffs).ntt(self.N)
 
-            # term = c/N * z(x) * B(x)
-            factor = c_over_N * z_val
-            term = b_val * factor.value
+        # term = c/N * z(x) * B(x)
+        factor = z_evals * c_over_N
+        term = ASSecretShare(factor * self.xi_share.share + (factor * H) * B_slope)
 
-            # C = A - term. A is scalar, term is share.
-            # share = A - share -> share = -share + A
-            # C_share = term * -1
-            C_share = term * (Mersenne61.MOD - 1)
-            if self.node_id == 0:
-                C_share = C_share + ASSecretShare(A_values[j])
+        # C = A - term. A is scalar, term is share.
+        # share = A - share -> share = -share + A
+        # C_share = term * -1
+        C_share = term * (Mersenne61.MOD - 1)
+        if self.node_id == 0:
+            C_share = C_share + ASSecretShare(Mersenne61ExtVector(A_values))
+
+        # the NTT is linear, so it takes shares of rho's coefficients to shares of rho on H
+        rho_evals = ASSecretShare(Mersenne61ExtVector(self.rho_coeffs.share).ntt(self.N))
 
-            rho_val = self.rho_coeffs[j % len(self.rho_coeffs)]
+        # sum_H C = 0 iff C = x * g with deg g <= N - 2 (sum_H h^i = 0 for 0 < i < N), so
+        # C_hat = g + rho = C / x + rho on H; deg rho <= N - 2 keeps the bound
+        H_inv = Mersenne61ExtVector.powers(self.omega_N.inverse(), self.N)
+        C_hat_share = C_share * H_inv + rho_evals
+        if tamper and self.node_id == 1:
+            C_hat_share = C_hat_share + ASSecretShare(Mersenne61ExtVector([1] + [0] * (self.N - 1)))
 
-            total = C_share + rho_val
-            C_plus_rho_evals.append(total)
+        Chat_evals = self.batch_reconstruct(C_hat_share, round_id=700)
 
-        Chat_evals = self.batch_reconstruct(C_plus_rho_evals, round_id=700)
+        # interpolate C_hat from its values on H in O(N log N) and check deg <= N - 2
+        Chat_degree = Chat_evals.intt().degree()
+        if Chat_degree > self.N - 2:
+            print(f"[{self.node_id}] \033[91mAbort: Step 11 deg(C_hat) = {Chat_degree} > {self.N - 2}\033[0m")
+            return 0
 
-        print(f"[{self.node_id}] Step 11: Degree Check (Simulated) - Done.")
+        print(f"[{self.node_id}] Step 11: Degree Check - Done.")
 
         gamma_open = self.secure_broadcast_reconstruct(self.gamma_share, round_id=800)
 
         B_gamma_share = (inv_f_beta_shares[0] * gamma_open.value) + (
                     self.xi_share * (Mersenne61.one() - gamma_open).value)
 
-        rho_gamma_share = ASSecretShare(Mersenne61.zero())
-        pow_gamma = Mersenne61.one()
-        for coeff in self.rho_coeffs:
-            term = coeff * pow_gamma.value
-            rho_gamma_share = rho_gamma_share + term
-            pow_gamma = pow_gamma * gamma_open
+        rho_gamma_share = ASSecretShare(self.rho_coeffs.share.dot(power_table(gamma_open, len(self.rho_coeffs.share))))
 
         payload_12 = [B_gamma_share.share.to_string(), rho_gamma_share.share.to_string()]
         self.party.broadcast(payload_12, round_id=900)
@@ -285,18 +300,33 @@ class LuArgProtocol:
         print(f"[{self.node_id}] Online Phase Complete.")
         return 1
 
-def test():
+def test(tamper: bool = False):
+    """
+    Honest run: the online phase must finish. tamper=True: party 1 corrupts its
+    share of C_hat and every party must abort at the step 11 degree check.
+    """
     node_id = int(sys.argv[1])
     num_parties = 4
     protocol = LuArgProtocol(node_id, num_parties)
     print(f"[{node_id}] Offline.")
-    protocol.preprocessing_phase()
+    protocol.preprocessing_phase(extra_triples=8)
+
+    # the dealt triples satisfy c = a * b: a batched product opens correctly
+    if not protocol.check_mult(8, round_id=10):
+        raise RuntimeError("Beaver triple check failed: opened product != product of openings")
+    print(f"[{node_id}] Beaver triple check: PASS")
 
     # 2. Online
     protocol.party.barrier()
     start_time = time.time()
 
-    success = protocol.online_phase()
+    success = protocol.online_phase(tamper)
     end_time = time.time()
-    if success:
+    if tamper:
+        if success:
+            raise RuntimeError("tampered C_hat passed the degree check")
+        print(f"[{node_id}] Tampered run aborted: PASS")
+    elif not success:
+        raise RuntimeError("honest run aborted")
+    else:
         print(f"[{node_id}] \033[92mProtocol Finished in {end_time - start_time:.4f}s\033[0m")
@@ -3,6 +3,9 @@ import os
 import ctypes
 import threading
 import time
+import random
+import hashlib
+import secrets
 from typing import List, Optional
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,6 +14,8 @@ sys.path.insert(0, project_root)
 
 from Network.Party import *
 from Datetype.GR import *
+from utils.OT_OLE import FixedDeltaVOLE
+from utils.accumulator import Accumulator
 
 
 
@@ -106,10 +111,23 @@ class CppOLEWrapper:
 
 
 class VOLEProtocol:
-    def __init__(self, node_id: int):
+    """
+    Without the C++ library the MACs come from FixedDeltaVOLE (COPE over IKNP)
+    in Python, with the same uniform GR key as the C++ path: 2 MiB of
+    corrections per value and peer.
+
+    binary_key=True (Python path only) takes the key from the binary lifts of
+    F_{2^64} instead, 32 KiB per value. A MAC error e = 2^v u still matches
+    e * alpha with probability 2^-64 only, since e * alpha is fixed by alpha
+    mod 2, but it is a different key distribution and must be asked for.
+    """
+    def __init__(self, node_id: int, binary_key: bool = False):
         self.party = Party(node_id)
         self.delta = None
         self.ole_cpp = CppOLEWrapper()
+        self.vole = None
+        if self.ole_cpp.lib is None:
+            self.vole = FixedDeltaVOLE(self.party, full_delta=not binary_key)
         self.round_counter = 0
         self.ole_base_port = 6000
         self.party.barrier()
@@ -123,10 +141,15 @@ class VOLEProtocol:
 
     def generate_key(self):
         print(f"[{self.party.node_id}] Generating Global Key Share (Delta)...")
-        self.delta = GaloisRingElement.random()
+        if self.vole is not None:
+            self.delta = self.vole.generate_delta()
+        else:
+            self.delta = GaloisRingElement.random()
         self.party.barrier()
 
     def commit_vector(self, values: List[GaloisRingElement] = None, src_id: int = 0, M: int = 0) -> AuthenticatedVectorShare:
+        if self.vole is not None:
+            return self._commit_vector_vole(values, src_id, M)
         if self.party.node_id == src_id:
             if values is None:
                 raise ValueError("Owner must provide values to commit")
@@ -164,6 +187,22 @@ class VOLEProtocol:
             mac_shares = self.ole_cpp.run_vector_receiver(port, M, self.delta)
             return AuthenticatedVectorShare([None]*M, mac_shares, src_id)
 
+    def _commit_vector_vole(self, values, src_id, M) -> AuthenticatedVectorShare:
+        rid = self._next_round()
+        if self.party.node_id == src_id:
+            if values is None:
+                raise ValueError("Owner must provide values to commit")
+            xs = GaloisRingVector.from_list(values)
+            my_macs = xs * self.delta
+            for pid in self.party.peers:
+                my_macs = my_macs + self.vole.extend_sender(pid, xs, rid)
+            return AuthenticatedVectorShare(values, my_macs.to_list(), self.party.node_id)
+
+        if M <= 0:
+            raise ValueError("Receivers must know the vector length M")
+        mac_shares = self.vole.extend_receiver(src_id, M, rid)
+        return AuthenticatedVectorShare([None] * M, mac_shares.to_list(), src_id)
+
     def open_and_verify(self, share: AuthenticatedVectorShare) -> List[GaloisRingElement]:
         print(f"[{self.party.node_id}] Opening vector value (M={share.M})...")
         rid = self._next_round()
@@ -183,25 +222,25 @@ class VOLEProtocol:
                 raise ValueError("Failed to receive Open values")
 
         print(f"[{self.party.node_id}] Values reconstructed. Verifying MACs...")
-        sigma_i = []
-        for i in range(M):
-            term = x_vals[i] * self.delta
-            sigma_i.append(share.macs[i] - term)
+        # one check for all M values: sum_i chi_i (mac_i - x_i * delta), chi from a
+        # joint coin drawn after the opening, two dot products
+        rid = self._next_round()
+        my_seed = secrets.token_hex(16)
+        self.party.broadcast(my_seed, rid)
+        seeds = self.party.receive_round(rid)
+        seeds[self.party.node_id] = my_seed
+        rng = random.Random(hashlib.sha256("".join(seeds[p] for p in sorted(seeds)).encode()).digest())
+        chis = GaloisRingVector.random(M, rng)
+        macs, xs = GaloisRingVector.from_list(share.macs), GaloisRingVector.from_list(x_vals)
+        sigma_i = chis.dot(macs) - chis.dot(xs) * self.delta
 
         rid = self._next_round()
-        msg_sigma = "|".join([s.to_string() for s in sigma_i])
-        self.party.broadcast(msg_sigma, rid)
+        self.party.broadcast(sigma_i.to_string(), rid)
         deltas_map = self.party.receive_round(rid)
-        total_sigma = sigma_i.copy()
-        
+        total_sigma = Accumulator().add(sigma_i)
         for pid, d_str in deltas_map.items():
-            d_strs = d_str.split("|")
-            for i in range(M):
-                total_sigma[i] = total_sigma[i] + GaloisRingElement.from_string(d_strs[i])
-        is_valid = True
-        for i in range(M):
-            if not all(coeff == 0 for coeff in total_sigma[i].coeffs):
-                is_valid = False
+            total_sigma.add(GaloisRingElement.from_string(d_str))
+        is_valid = not any(total_sigma.value().coeffs)
         if share.vals[0] is None:
             share.vals = x_vals
             
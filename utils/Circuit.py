@@ -1,4 +1,9 @@
 from typing import Sequence
+from array import array
+import hashlib
+import json
+import os
+import numpy as np
 from bfcl.bfcl import operation, op, gate, circuit
 from circuitry import *
 """
@@ -27,25 +32,35 @@ operation.token_op_pairs = [
 
 
 class Gate():
-    #from Bristol Fashion file
-    # gate_ID,[Number input wires, Number output wires,List of input wires, List of output wires,Gate operation ]
-    # 2 1 3 4 5 XOR
-    input = []
-    output = 0
-    is_input: bool = False,
-    is_output: bool = False
-    def __init__(self, id, BF):
+    """
+    Read-only view of gate id_num in a GateStore.
+    """
+    __slots__ = ("_store", "id_num")
 
+    def __init__(self, store, id):
+        self._store = store
         self.id_num = id
-        self.num_input = int(BF[0])
-        self.num_output = int(BF[1])
-        self.gate_type = BF[-1]
-        self.input_wires = []
-        self.output_wires = []
-        for i in range(0,int(self.num_input)):
-            self.input_wires.append(int(BF[2+i]))
-        for i in range(0,int(self.num_output)):
-            self.output_wires.append(int(BF[-2-i]))
+
+    @property
+    def num_input(self) -> int:
+        return len(self.input_wires)
+
+    @property
+    def num_output(self) -> int:
+        return len(self.output_wires)
+
+    @property
+    def gate_type(self) -> str:
+        return self._store.types[self._store.code[self.id_num]]
+
+    @property
+    def input_wires(self):
+        return self._store.inputs(self.id_num)
+
+    @property
+    def output_wires(self):
+        return self._store.outputs(self.id_num)
+
     def toString(self) -> str:
         """
         Emit a Bristol Fashion string for this gate.
@@ -58,75 +73,652 @@ class Gate():
         ])
 
 
+CIRCUIT_ROOT = os.environ.get(
+    "CIRCUIT_ROOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Circuits"))
+
+
+class GateStore():
+    """
+    Gates of a Bristol circuit as struct-of-arrays, 15 bytes per ordinary gate:
+    int32 in0 / in1 / out0 and uint8 code / n_in / n_out, -1 in unused slots.
+    Gates with more than 2 inputs or 1 output keep their wires in a small CSR
+    overflow table (wide_*). Indexing gives a Gate view.
+    """
+    ARRAYS = ("code", "n_in", "n_out", "in0", "in1", "out0",
+              "wide_gate", "wide_in_ptr", "wide_in", "wide_out_ptr", "wide_out")
+
+    def __init__(self, types, code, n_in, n_out, in0, in1, out0,
+                 wide_gate, wide_in_ptr, wide_in, wide_out_ptr, wide_out):
+        self.types = list(types)
+        self.code = code
+        self.n_in = n_in
+        self.n_out = n_out
+        self.in0 = in0
+        self.in1 = in1
+        self.out0 = out0
+        self.wide_gate = wide_gate
+        self.wide_in_ptr = wide_in_ptr
+        self.wide_in = wide_in
+        self.wide_out_ptr = wide_out_ptr
+        self.wide_out = wide_out
+        self._wide = {int(g): k for k, g in enumerate(wide_gate)}
+
+    def __len__(self):
+        return len(self.code)
+
+    def nbytes(self) -> int:
+        return sum(np.asarray(getattr(self, name)).nbytes for name in self.ARRAYS)
+
+    def inputs(self, i):
+        k = self._wide.get(i)
+        if k is not None:
+            return self.wide_in[self.wide_in_ptr[k]:self.wide_in_ptr[k + 1]].tolist()
+        return [int(self.in0[i]), int(self.in1[i])][:self.n_in[i]]
+
+    def outputs(self, i):
+        k = self._wide.get(i)
+        if k is not None:
+            return self.wide_out[self.wide_out_ptr[k]:self.wide_out_ptr[k + 1]].tolist()
+        return [int(self.out0[i])][:self.n_out[i]]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return Gate(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Gate(self, i)
+
+    def _csr(self, cols, counts, wide_ptr, wide_wires):
+        """
+        (ptr, wires) over all gates, merging the columns with the overflow table.
+        """
+        cols = np.stack([np.asarray(c, dtype=np.int64) for c in cols], axis=1)
+        counts = np.asarray(counts, dtype=np.int64).copy()
+        wide = np.asarray(self.wide_gate, dtype=np.int64)
+        counts[wide] = 0
+        wires = cols[np.arange(cols.shape[1]) < counts[:, None]]
+        if len(wide):
+            sizes = np.diff(np.asarray(wide_ptr, dtype=np.int64))
+            narrow_ptr = np.zeros(len(self) + 1, dtype=np.int64)
+            np.cumsum(counts, out=narrow_ptr[1:])
+            wires = np.insert(wires, np.repeat(narrow_ptr[wide], sizes), np.asarray(wide_wires, dtype=np.int64))
+            counts[wide] = sizes
+        ptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=ptr[1:])
+        return ptr, wires
+
+    def input_csr(self):
+        return self._csr((self.in0, self.in1), self.n_in, self.wide_in_ptr, self.wide_in)
+
+    def output_csr(self):
+        return self._csr((self.out0,), self.n_out, self.wide_out_ptr, self.wide_out)
+
+    def save(self, path, header=None):
+        tmp = path + ".tmp%d" % os.getpid()
+        os.makedirs(tmp, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, name + ".npy"), np.asarray(getattr(self, name)))
+        with open(os.path.join(tmp, "types.json"), "w") as f:
+            json.dump(self.types, f)
+        with open(os.path.join(tmp, "header.json"), "w") as f:
+            json.dump(header, f)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # another process filled the cache first
+            for name in os.listdir(tmp):
+                os.remove(os.path.join(tmp, name))
+            os.rmdir(tmp)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "types.json")) as f:
+            types = json.load(f)
+        arrays = [np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in cls.ARRAYS]
+        return cls(types, *arrays)
+
+
+def parse_bristol(lines):
+    """
+    Streaming Bristol Fashion parser. The first three non-empty lines are the header,
+    every following non-empty line is a gate. Returns (header, GateStore) where
+    header is the three header lines split into ints.
+    """
+    header = []
+    types, type_code = [], {}
+    code, n_in, n_out = array("B"), array("B"), array("B")
+    in0, in1, out0 = array("i"), array("i"), array("i")
+    wide_gate, wide_in, wide_out = array("q"), array("i"), array("i")
+    wide_in_ptr, wide_out_ptr = array("q", [0]), array("q", [0])
+    for line in lines:
+        t = line.split()
+        if not t:
+            continue
+        if len(header) < 3:
+            header.append([int(x) for x in t])
+            continue
+        a, b = int(t[0]), int(t[1])
+        c = type_code.get(t[-1])
+        if c is None:
+            c = type_code[t[-1]] = len(types)
+            types.append(t[-1])
+        code.append(c)
+        if a <= 2 and b <= 1:
+            n_in.append(a)
+            n_out.append(b)
+            in0.append(int(t[2]) if a > 0 else -1)
+            in1.append(int(t[3]) if a > 1 else -1)
+            out0.append(int(t[2 + a]) if b > 0 else -1)
+        else:
+            n_in.append(min(a, 255))
+            n_out.append(min(b, 255))
+            in0.append(-1)
+            in1.append(-1)
+            out0.append(-1)
+            wide_gate.append(len(code) - 1)
+            wide_in.extend(map(int, t[2:2 + a]))
+            wide_out.extend(map(int, t[2 + a:2 + a + b]))
+            wide_in_ptr.append(len(wide_in))
+            wide_out_ptr.append(len(wide_out))
+    store = GateStore(types,
+                      np.frombuffer(code, dtype=np.uint8),
+                      np.frombuffer(n_in, dtype=np.uint8),
+                      np.frombuffer(n_out, dtype=np.uint8),
+                      np.frombuffer(in0, dtype=np.int32),
+                      np.frombuffer(in1, dtype=np.int32),
+                      np.frombuffer(out0, dtype=np.int32),
+                      np.frombuffer(wide_gate, dtype=np.int64),
+                      np.frombuffer(wide_in_ptr, dtype=np.int64),
+                      np.frombuffer(wide_in, dtype=np.int32),
+                      np.frombuffer(wide_out_ptr, dtype=np.int64),
+                      np.frombuffer(wide_out, dtype=np.int32))
+    return header, store
+
+
+CACHE_VERSION = 2
+
+
+def _file_hash(filename) -> str:
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_bristol(filename, cache_dir=None):
+    """
+    parse_bristol on a file, through an on-disk cache keyed by the file's sha256.
+    Cached arrays are memory-mapped, so reloading a large circuit costs only the hash.
+    cache_dir=False disables the cache.
+    """
+    if cache_dir is False:
+        with open(filename, "r") as f:
+            return parse_bristol(f)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)), ".cache")
+    path = os.path.join(cache_dir, "%s.v%d" % (_file_hash(filename), CACHE_VERSION))
+    if os.path.isdir(path):
+        with open(os.path.join(path, "header.json")) as f:
+            header = json.load(f)
+        return header, GateStore.load(path)
+
+    with open(filename, "r") as f:
+        header, store = parse_bristol(f)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        store.save(path, header)
+    except OSError:
+        pass  # read-only circuit directory: just run uncached
+    return header, store
+
+
+
+
+def _bitslice_op(table):
+    """
+    Word-wide version of a bfcl truth table; entry 2*a + b (or a) is the output bit.
+    """
+    if len(table) == 2:
+        return {
+            (0, 1): lambda a: a,
+            (1, 0): lambda a: ~a,
+            (0, 0): lambda a: a & 0,
+            (1, 1): lambda a: ~(a & 0),
+        }[tuple(table)]
+    fast = {
+        (0, 0, 0, 1): lambda a, b: a & b,
+        (0, 1, 1, 0): lambda a, b: a ^ b,
+        (0, 1, 1, 1): lambda a, b: a | b,
+        (1, 1, 1, 0): lambda a, b: ~(a & b),
+        (1, 0, 0, 0): lambda a, b: ~(a | b),
+        (1, 0, 0, 1): lambda a, b: ~(a ^ b),
+    }
+    if tuple(table) in fast:
+        return fast[tuple(table)]
+    t00, t01, t10, t11 = table
+
+    def f(a, b):
+        res = a & 0
+        if t00: res |= ~a & ~b
+        if t01: res |= ~a & b
+        if t10: res |= a & ~b
+        if t11: res |= a & b
+        return res
+    return f
+
+
+BITSLICE_OPS = {name: _bitslice_op(tuple(table)) for name, table in operation.token_op_pairs}
+BITSLICE_OPS["EQW"] = BITSLICE_OPS["LID"]
+
+
+class CompiledCircuit():
+    """
+    Flat array form of a Bristol circuit.
+
+    The program is (code, in_ptr, in_wires, out_ptr, out_wires) in gate order, with
+    in_wires[in_ptr[g]:in_ptr[g+1]] the inputs of gate g and types[code[g]] its
+    gate type. For evaluation the gates are grouped by topological level and by
+    (type, #in, #out), so every group is one NumPy gather / op / scatter over
+    all gates and all instances at once.
+
+    Wires are mapped onto a register file (reg[wire]) by a liveness pass: a
+    register is handed back once the last level reading its wire is done, so
+    evaluation holds num_regs rows, bounded by the circuit width, not wire_num.
+    The first live_in wires are inputs and the last live_out wires stay live
+    until the end.
+    """
+    OP_ZERO = 0     # anything that is not ADD/MUL outputs 0, as in Circuit.evaluate
+    OP_ADD = 1
+    OP_MUL = 2
+    OPCODES = {"ADD": OP_ADD, "MUL": OP_MUL}
+
+    def __init__(self, gates, wire_num, wire_input_num, wire_output_num, live_in=None, live_out=None):
+        self.wire_num = int(wire_num)
+        self.wire_input_num = int(wire_input_num)
+        self.wire_output_num = int(wire_output_num)
+        self.live_in = self.wire_input_num if live_in is None else int(live_in)
+        self.live_out = self.wire_output_num if live_out is None else int(live_out)
+        self.gate_num = len(gates)
+
+        if not isinstance(gates, GateStore):
+            gates = parse_bristol(["0 0", "0", "0"] + [g.toString() for g in gates])[1]
+        self.types = list(gates.types)
+        self.code = np.asarray(gates.code, dtype=np.uint8)
+        self.type_op = [self.OPCODES.get(t, self.OP_ZERO) for t in self.types]
+        self.in_ptr, self.in_wires = gates.input_csr()
+        self.out_ptr, self.out_wires = gates.output_csr()
+
+        self.level = self._levels()
+        self.layers = self._group()
+        self.reg, self.num_regs = self._allocate()
+        self.layers = [[(code, self.reg[ins], self.reg[outs]) for code, ins, outs in layer]
+                       for layer in self.layers]
+
+    def _levels(self) -> np.ndarray:
+        # level(g) = 1 + max level of the wires it reads; inputs and unset wires are level 0
+        wire_level = np.zeros(self.wire_num, dtype=np.int64)
+        level = np.zeros(self.gate_num, dtype=np.int64)
+        in_ptr, out_ptr = self.in_ptr.tolist(), self.out_ptr.tolist()
+        in_wires, out_wires = self.in_wires.tolist(), self.out_wires.tolist()
+        wl = wire_level.tolist()
+        for g in range(self.gate_num):
+            lv = 1 + max((wl[w] for w in in_wires[in_ptr[g]:in_ptr[g + 1]]), default=0)
+            level[g] = lv
+            for w in out_wires[out_ptr[g]:out_ptr[g + 1]]:
+                wl[w] = lv
+        return level
+
+    def _group(self):
+        """
+        [[(code, in_idx (k, nin), out_idx (k, nout)), ...] per level]
+        """
+        n_in = np.diff(self.in_ptr)
+        n_out = np.diff(self.out_ptr)
+        order = np.lexsort((n_out, n_in, self.code, self.level))
+        keys = np.stack([self.level[order], self.code[order], n_in[order], n_out[order]], axis=1)
+        bounds = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        layers = []
+        for idx in np.split(order, bounds):
+            if len(idx) == 0:
+                continue
+            g0 = idx[0]
+            lv, code, nin, nout = int(self.level[g0]), int(self.code[g0]), int(n_in[g0]), int(n_out[g0])
+            ins = self.in_wires[self.in_ptr[idx][:, None] + np.arange(nin)]
+            outs = self.out_wires[self.out_ptr[idx][:, None] + np.arange(nout)]
+            if lv > len(layers):
+                layers.append([])
+            layers[-1].append((code, ins, outs))
+        return layers
+
+    def _allocate(self):
+        """
+        Liveness pass at level granularity: a wire read last at level L frees its
+        register for level L + 1 (not L, since the groups of a level run one after
+        the other). Returns (reg, num_regs), reg[w] = -1 for wires never touched.
+        """
+        INF = np.iinfo(np.int64).max
+        gate_in = np.repeat(np.arange(self.gate_num), np.diff(self.in_ptr))
+        gate_out = np.repeat(np.arange(self.gate_num), np.diff(self.out_ptr))
+
+        # level at which each wire gets its value, -1 if it never does
+        born = np.full(self.wire_num, -1, dtype=np.int64)
+        born[self.out_wires] = self.level[gate_out]
+        inputs = np.arange(min(self.live_in, self.wire_num))
+        born[inputs] = 0
+        born[self.in_wires[born[self.in_wires] < 0]] = 0    # read but never set: stays 0
+        born[self.wire_num - self.live_out:][born[self.wire_num - self.live_out:] < 0] = 0
+        last = born.copy()
+        np.maximum.at(last, self.in_wires, self.level[gate_in])
+        last[self.wire_num - self.live_out:] = INF
+
+        dying = np.flatnonzero((born >= 0) & (last != INF))
+        by_death = dying[np.argsort(last[dying], kind="stable")]
+        death_bounds = np.searchsorted(last[by_death], np.arange(len(self.layers) + 1))
+
+        reg = np.full(self.wire_num, -1, dtype=np.int64)
+        free = np.zeros(0, dtype=np.int64)
+        num_regs = 0
+        for lv in range(len(self.layers) + 1):
+            if lv == 0:
+                wires = np.flatnonzero(born == 0)
+            else:
+                wires = np.concatenate([outs.ravel() for _, _, outs in self.layers[lv - 1]])
+                free = np.concatenate((free, reg[by_death[death_bounds[lv - 1]:death_bounds[lv]]]))
+            take = min(len(wires), len(free))
+            reg[wires] = np.concatenate((free[len(free) - take:],
+                                         np.arange(num_regs, num_regs + len(wires) - take)))
+            free = free[:len(free) - take]
+            num_regs += len(wires) - take
+        return reg, num_regs
+
+    def peak_bytes(self, Mod, batch=1) -> int:
+        """
+        Size of the register file for one evaluate_batch call.
+        """
+        return self.num_regs * batch * (8 if self._dtype(Mod) is np.uint64 else 40)
+
+    @staticmethod
+    def _dtype(Mod):
+        # uint64 if products of two reduced values fit (or wrap exactly, for 2^64)
+        if Mod == 1 << 64 or Mod <= 1 << 32:
+            return np.uint64
+        return object
+
+    def evaluate_batch(self, inputs, Mod) -> np.ndarray:
+        """
+        inputs: (B, wire_input_num) integers, one row per instance.
+        Returns the (B, wire_output_num) values of the last wire_output_num wires.
+        """
+        dtype = self._dtype(Mod)
+        if not (isinstance(inputs, np.ndarray) and inputs.dtype == dtype):
+            inputs = np.array(inputs, dtype=object) % Mod
+        if inputs.ndim != 2 or inputs.shape[1] != self.wire_input_num:
+            raise ValueError('The input value is inconsistent with the circuit gate.')
+        mod = None if Mod == 1 << 64 else (np.uint64(Mod) if dtype is np.uint64 else Mod)
+
+        B = inputs.shape[0]
+        wire = np.zeros((self.num_regs, B), dtype=dtype)
+        wire[self.reg[:self.wire_input_num]] = inputs.T.astype(dtype)
+
+        for layer in self.layers:
+            for code, ins, outs in layer:
+                op = self.type_op[code]
+                if op == self.OP_ZERO or ins.shape[1] == 0:
+                    res = np.zeros((len(ins), B), dtype=dtype) + (op == self.OP_MUL)
+                else:
+                    vals = wire[ins]  # (k, nin, B)
+                    res = vals[:, 0] if mod is None else vals[:, 0] % mod
+                    for i in range(1, ins.shape[1]):
+                        res = res + vals[:, i] if op == self.OP_ADD else res * vals[:, i]
+                        if mod is not None:
+                            res = res % mod
+                for o in range(outs.shape[1]):
+                    wire[outs[:, o]] = res
+        return wire[self.reg[self.wire_num - self.wire_output_num:]].T
+
+    def evaluate_bitsliced(self, words, n_out) -> np.ndarray:
+        """
+        Boolean evaluation on packed words: words is (#input wires, W) uint64 and bit j
+        of column w is instance 64*w + j. Returns the last n_out wires, (n_out, W).
+        """
+        words = np.asarray(words, dtype=np.uint64)
+        unsupported = [t for t in self.types if t not in BITSLICE_OPS]
+        if unsupported:
+            raise ValueError(f"Unsupported boolean gates: {unsupported}")
+
+        if words.shape[0] > self.live_in or n_out > self.live_out:
+            raise ValueError("inputs / outputs beyond the live_in / live_out wires of this program")
+        wire = np.zeros((self.num_regs, words.shape[1]), dtype=np.uint64)
+        wire[self.reg[:words.shape[0]]] = words
+        for layer in self.layers:
+            for code, ins, outs in layer:
+                res = BITSLICE_OPS[self.types[code]](*[wire[ins[:, i]] for i in range(ins.shape[1])])
+                for o in range(outs.shape[1]):
+                    wire[outs[:, o]] = res
+        return wire[self.reg[self.wire_num - n_out:]]
+
+
+class CircuitLayer():
+    """
+    One multiplicative layer: the MUL/AND gates of depth d (all inputs ready at
+    d - 1, so they can share one batched opening), then the linear gates of
+    depth d in file order.
+    """
+    def __init__(self, depth):
+        self.depth = depth
+        self.mul = []
+        self.linear = []
+        self.release = []   # wires not read after this layer
+
+    def __repr__(self):
+        return f"<Layer depth={self.depth} mul={len(self.mul)} linear={len(self.linear)}>"
+
+
+class CircuitSchedule():
+    """
+    Multiplicative-depth schedule of a circuit.
+
+    depth(wire) is 0 for inputs, a linear gate outputs the max depth of its
+    inputs and a MUL/AND gate outputs that max + 1. Evaluating layer by layer
+    costs one round per layer, i.e. rounds = multiplicative depth.
+
+    layer.release lists the wires whose last reader is in that layer, so
+    evaluate(..., outputs=...) can drop them and only hold the live width.
+    """
+    NONLINEAR = ("MUL", "AND")
+    LINEAR = ("ADD", "XOR", "EQW")
+
+    def __init__(self, gates, wire_num):
+        self.gates = gates
+        self.wire_num = int(wire_num)
+        wire_depth = [0] * self.wire_num
+        last = [0] * self.wire_num
+        self.layers = [CircuitLayer(0)]
+        for g in gates:
+            ins = g.input_wires
+            d = max((wire_depth[w] for w in ins), default=0)
+            if g.gate_type in self.NONLINEAR:
+                d += 1
+                while len(self.layers) <= d:
+                    self.layers.append(CircuitLayer(len(self.layers)))
+                self.layers[d].mul.append(g)
+            else:
+                self.layers[d].linear.append(g)
+            for w in g.output_wires:
+                wire_depth[w] = d
+                last[w] = d
+            for w in ins:
+                last[w] = max(last[w], d)
+        for w, d in enumerate(last):
+            self.layers[d].release.append(w)
+
+    @property
+    def depth(self):
+        return len(self.layers) - 1
+
+    def stats(self) -> dict:
+        widths = [len(layer.mul) for layer in self.layers[1:]]
+        return {
+            'depth': self.depth,
+            'mul_gates': sum(widths),
+            'linear_gates': sum(len(layer.linear) for layer in self.layers),
+            'max_width': max(widths, default=0),
+            'mean_width': sum(widths) / len(widths) if widths else 0,
+            'widths': widths,
+        }
+
+    def evaluate(self, inputs, add, mul_batch, zero=None, outputs=None):
+        """
+        Evaluate over any value type: add(x, y) for linear gates and
+        mul_batch(xs, ys) -> zs once per layer for all its MUL/AND gates.
+        Returns the full wire list, or with outputs (wire ids) only those values;
+        then every other wire is dropped after its last reading layer.
+        """
+        keep = None if outputs is None else set(outputs)
+        wire = list(inputs) + [zero] * (self.wire_num - len(inputs))
+        for layer in self.layers:
+            if layer.mul:
+                xs = [wire[g.input_wires[0]] for g in layer.mul]
+                ys = [wire[g.input_wires[1]] for g in layer.mul]
+                for g, z in zip(layer.mul, mul_batch(xs, ys)):
+                    for o in g.output_wires:
+                        wire[o] = z
+            for g in layer.linear:
+                if g.gate_type not in self.LINEAR:
+                    raise ValueError(f"Unsupported gate in layered evaluation: {g.gate_type}")
+                res = wire[g.input_wires[0]]
+                for w in g.input_wires[1:]:
+                    res = add(res, wire[w])
+                for o in g.output_wires:
+                    wire[o] = res
+            if keep is not None:
+                for w in layer.release:
+                    if w not in keep:
+                        wire[w] = None
+        if outputs is None:
+            return wire
+        return [wire[w] for w in outputs]
+
 
 class Circuit():
-    c1:circuit
-    def __init__(self,name,FromFile=True):
+    def __init__(self, name, FromFile=True, root=None, cache_dir=None):
+        """
+        FromFile: name is a path relative to root (CIRCUIT_ROOT by default), without ".txt".
+        Otherwise name is the Bristol Fashion text itself.
+        cache_dir: where compiled arrays are kept (default <circuit dir>/.cache), False to disable.
+        """
+        self._compiled = None
+        self._schedule = None
+        self._c1 = None
         if FromFile == True:
-            self.filename = '/home/jaden/workspace/mpcSok/Benchmark/circuits/%s.txt' %(name)
-            self.gates = []
-            self.circuit_str = []
-            self.wire_num = 0
-            self.gate_num=0
-
-            #The below is for the Arithmetic circuits
-            self.wire_output_num =0
-            self.wire_input_num = 0
-            with open(self.filename, 'r') as f:
-                i=0
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        self.circuit_str.append(line)
-                    if i >=4 and line:
-                        self.gates.append(Gate(i,line.strip().split()))
-                        self.circuit_str.append(line)
-                    i = i + 1
-
-            self.c1 = circuit("\n".join(self.circuit_str))
-            self.gate_num,self.wire_num= int(self.circuit_str[0].split()[0]),int(self.circuit_str[0].split()[1])
-            self.wire_input_num = int(self.circuit_str[1].split()[0])
-            self.wire_output_num = int(self.circuit_str[2].split()[0])
-
+            self.filename = os.path.join(root or CIRCUIT_ROOT, '%s.txt' % name)
+            header, self.gates = load_bristol(self.filename, cache_dir)
+            self._text = None
         else:
             #for code test
-            self.c1 = circuit(name)
+            self.filename = None
+            header, self.gates = parse_bristol(name.split("\n"))
+            self._text = name
+
+        self.header = header
+        self.gate_num, self.wire_num = header[0][0], header[0][1]
+        self.wire_input_num = header[1][0]
+        self.wire_output_num = header[2][0]
+        # bit widths of the input / output values (boolean circuits)
+        self.input_lengths = header[1][1:]
+        self.output_lengths = header[2][1:]
+
+    @property
+    def c1(self) -> circuit:
+        """
+        The bfcl circuit, only built when asked for.
+        """
+        if self._c1 is None:
+            if self._text is None:
+                with open(self.filename, 'r') as f:
+                    self._text = f.read()
+            self._c1 = circuit(self._text)
+        return self._c1
+
     def toString(self):
-        return self.circuit_str
+        lines = [" ".join(str(x) for x in h) for h in self.header]
+        lines.extend(g.toString() for g in self.gates)
+        return lines
     def evaluate(self,inputs:Sequence[Sequence[int]], Mod=2)-> Sequence[Sequence[int]]:
         if Mod == 2:
-            # remain to do
-            return self.c1.evaluate(inputs)
+            bits = self.evaluate_bitsliced([inputs])[0].tolist()
+            values, start = [], 0
+            for length in self.output_lengths:
+                values.append(bits[start:start + length])
+                start += length
+            return values
 
         else:
             inputs = [b for bs in inputs for b in bs]
             if len(inputs) != self.wire_input_num:
                 raise ValueError('The input value is inconsistent with the circuit gate.')
-            wire = inputs + [0] * (int(self.wire_num) - len(inputs))
-            # If no output wire index is present, use the gate count as the index.
-            for g in self.gates:
-                re =0 + int(g.gate_type =="MUL")
-                for i in range(0,g.num_input):
-                    if g.gate_type == "ADD":
-                        re = (re + wire[g.input_wires[i]]) % Mod
-                    elif g.gate_type =="MUL":
-                        re = (re * wire[g.input_wires[i]]) % Mod
-                for o in range(0,g.num_output):
-                    # print(re)
-                    wire[g.output_wires[o]] = re
-            return wire[-self.wire_output_num:]
-            # return wire
+            return [int(v) for v in self.evaluate_batch([inputs], Mod)[0]]
+
+    def schedule(self) -> CircuitSchedule:
+        if self._schedule is None:
+            self._schedule = CircuitSchedule(self.gates, self.wire_num)
+        return self._schedule
+
+    def compile(self) -> CompiledCircuit:
+        if self._compiled is None:
+            # boolean headers count values, the bit widths say how many wires they span
+            self._compiled = CompiledCircuit(self.gates, self.wire_num, self.wire_input_num, self.wire_output_num,
+                                             live_in=max(self.wire_input_num, sum(self.input_lengths)),
+                                             live_out=max(self.wire_output_num, sum(self.output_lengths)))
+        return self._compiled
+
+    def evaluate_batch(self, inputs, Mod) -> np.ndarray:
+        """
+        Arithmetic evaluation of many instances at once: inputs is (B, wire_input_num).
+        """
+        return self.compile().evaluate_batch(inputs, Mod)
+
+    def evaluate_bitsliced(self, instances) -> np.ndarray:
+        """
+        Boolean evaluation of many instances, 64 per machine word.
+        instances: per-instance inputs in the evaluate() format, or a (B, #input bits) 0/1 array.
+        Returns a (B, #output bits) uint8 array.
+        """
+        if not isinstance(instances, np.ndarray):
+            instances = [[b for bs in inst for b in bs] for inst in instances]
+        bits = np.asarray(instances, dtype=np.uint8)
+        if bits.ndim != 2 or bits.shape[1] != sum(self.input_lengths):
+            raise ValueError('The input value is inconsistent with the circuit gate.')
+
+        B = bits.shape[0]
+        W = max(1, -(-B // 64))
+        padded = np.zeros((bits.shape[1], W * 64), dtype=np.uint8)
+        padded[:, :B] = bits.T
+        words = np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+        out = self.compile().evaluate_bitsliced(words, sum(self.output_lengths))
+        out_bits = np.unpackbits(out.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        return out_bits[:, :B].T
 
 
 
 if __name__ == "__main__":
-    # s = ['7 36', '2 4 4', '1 1']
-    # s.extend(['2 1 0 1 15 AND', '2 1 2 3 16 AND'])
-    # s.extend(['2 1 15 16 8 AND', '2 1 4 5 22 AND'])
-    # s.extend(['2 1 6 7 23 AND', '2 1 22 23 9 AND'])
-    # s.extend(['2 1 8 9 35 AND'])
-    # c = Circuit("\n".join(s),False)
-    # print(c.evaluate([[1, 0, 1, 1], [1, 1, 1, 0]]))
+    s = ['7 36', '2 4 4', '1 1']
+    s.extend(['2 1 0 1 15 AND', '2 1 2 3 16 AND'])
+    s.extend(['2 1 15 16 8 AND', '2 1 4 5 22 AND'])
+    s.extend(['2 1 6 7 23 AND', '2 1 22 23 9 AND'])
+    s.extend(['2 1 8 9 35 AND'])
+    c = Circuit("\n".join(s),False)
+    assert c.evaluate([[1, 0, 1, 1], [1, 1, 1, 0]]) == [[0]] and c.evaluate([[1] * 4, [1] * 4]) == [[1]]
+    from itertools import product
+    inputs = np.array(list(product(*([[0, 1]] * 8))))
+    assert c.evaluate_bitsliced(inputs)[:, 0].tolist() == [0] * 255 + [1]
 
     c = Circuit("Arithmetic/Adder")
     a = [1,1,1,1]
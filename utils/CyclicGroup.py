@@ -1,34 +1,263 @@
 import os
+import secrets
+from functools import lru_cache
+
 import gmpy2
+from gmpy2 import mpz
 from Crypto.Util.number import *
-from random import randint
+from Crypto.PublicKey.ECC import EccPoint
 import sympy
 
-def nbit_prime(l):
+def nbit_prime(l=2048):
     bstr = os.urandom(l//8)# 2048-bit-random
     rnum = bytes_to_long(bstr)# convert the bytes to long
     return gmpy2.next_prime(rnum)# get the next prime
 
+# RFC 3526 MODP groups: safe primes p = 2q + 1, generator 2 of the order-q subgroup
+MODP_PRIMES = {
+    1536: int(
+        "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+        "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+        "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F"
+        "83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA237327FFFFFFFFFFFFFFFF", 16),
+    2048: int(
+        "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+        "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+        "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F"
+        "83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+        "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA0510"
+        "15728E5A8AACAA68FFFFFFFFFFFFFFFF", 16),
+    3072: int(
+        "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+        "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+        "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F"
+        "83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+        "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA0510"
+        "15728E5A8AAAC42DAD33170D04507A33A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7"
+        "ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864D87602733EC86A64521F2B18177B200C"
+        "BBE117577A615D6C770988C0BAD946E208E24FA074E5AB3143DB5BFCE0FD108E4B82D120A93AD2CAFFFFFFFFFFFFFFFF", 16),
+    4096: int(
+        "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+        "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+        "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F"
+        "83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+        "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA0510"
+        "15728E5A8AAAC42DAD33170D04507A33A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7"
+        "ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864D87602733EC86A64521F2B18177B200C"
+        "BBE117577A615D6C770988C0BAD946E208E24FA074E5AB3143DB5BFCE0FD108E4B82D120A92108011A723C12A787E6D7"
+        "88719A10BDBA5B2699C327186AF4E23C1A946834B6150BDA2583E9CA2AD44CE8DBBBC2DB04DE8EF92E8EFC141FBECAA6"
+        "287C59474E6BC05D99B2964FA090C3A2233BA186515BE7ED1F612970CEE2D7AFB81BDD762170481CD0069127D5B05AA9"
+        "93B4EA988D8FDDC186FFB7DC90A6C08F4DF435C934063199FFFFFFFFFFFFFFFF", 16),
+}
+
+
+@lru_cache(maxsize=None)
+def _prime_factors(p):
+    q = (p - 1) // 2
+    if gmpy2.is_prime(q):# safe prime: no factoring needed
+        return (2, q)
+    return tuple(sympy.primefactors(p - 1))
+
+
+class FixedBase:
+    """
+    Fixed-base windowing: rows[i][d] = base^(d * 2^(w*i)), so base^e costs one
+    multiplication per w-bit digit of e and no squarings. Rows are built on
+    demand, up to the longest exponent seen.
+    """
+    def __init__(self, base, p, w=6):
+        self.p = mpz(p)
+        self.w = w
+        self.rows = []
+        self._next = mpz(base) % self.p# base^(2^(w*len(rows)))
+    def _grow(self, n):
+        while len(self.rows) < n:
+            row = [mpz(1), self._next]
+            for _ in range((1 << self.w) - 2):
+                row.append(row[-1] * self._next % self.p)
+            self.rows.append(row)
+            self._next = row[-1] * self._next % self.p
+    def pow(self, exponent):
+        e = int(exponent)
+        if e < 0:
+            raise ValueError("FixedBase.pow needs a non-negative exponent")
+        self._grow(-(-e.bit_length() // self.w))
+        mask = (1 << self.w) - 1
+        acc = mpz(1)
+        i = 0
+        while e:
+            d = e & mask
+            if d:
+                acc = acc * self.rows[i][d] % self.p
+            e >>= self.w
+            i += 1
+        return acc
+
+
 class CyclicGroup:# Cyclic group
     # test passed
-    def __init__(self, p=None, g=None):
-        self.p = p or nbit_prime() # get prime
-        self.generator = g or self.find_generator()
+    def __init__(self, p=None, g=None, window=6):
+        if p is None:# a random 2048-bit p - 1 cannot be factored: default to RFC 3526
+            p, g = MODP_PRIMES[2048], g or 2
+        self.p = mpz(p) # get prime
+        self.generator = mpz(g or self.find_generator())
+        self.window = window
+        self._g_table = None
+        # safe prime with g in the order-q subgroup (RFC 3526, g = 2): decode checks membership
+        q = (self.p - 1) // 2
+        self.q = q if gmpy2.is_prime(q) and gmpy2.powmod(self.generator, q, self.p) == 1 else None
     def mul(self, num1, num2):
         return (num1 * num2) % self.p
     def div(self,a,b):
-        return self.mul(a,pow(b,self.p-2,self.p))
+        return self.mul(a, gmpy2.invert(b, self.p))
     def pow(self, base, exponent):
-        return pow(base, exponent, self.p)
+        if base == self.generator and exponent >= 0:
+            return self.pow_g(exponent)
+        return gmpy2.powmod(base, exponent, self.p)
+    def pow_g(self, exponent):
+        if self._g_table is None:
+            self._g_table = FixedBase(self.generator, self.p, self.window)
+        return self._g_table.pow(exponent)
+    def fixed_base(self, base):
+        """
+        Precomputed table for a base raised to many exponents (e.g. A^b_i in base OTs).
+        """
+        return FixedBase(base, self.p, self.window)
+    def multi_pow(self, bases, exponents, w=4):
+        """
+        prod_i bases[i]^exponents[i] with interleaved windows (Straus): one shared
+        chain of squarings, one multiplication per base per w-bit digit.
+        """
+        tables = []
+        for b in bases:
+            row = [mpz(1), mpz(b) % self.p]
+            for _ in range((1 << w) - 2):
+                row.append(row[-1] * row[1] % self.p)
+            tables.append(row)
+        exponents = [int(e) for e in exponents]
+        if any(e < 0 for e in exponents):
+            raise ValueError("multi_pow needs non-negative exponents")
+        n = -(-max([e.bit_length() for e in exponents] + [1]) // w)
+        mask = (1 << w) - 1
+        acc = mpz(1)
+        for i in range(n - 1, -1, -1):
+            acc = gmpy2.powmod(acc, 1 << w, self.p)
+            for row, e in zip(tables, exponents):
+                d = (e >> (w * i)) & mask
+                if d:
+                    acc = acc * row[d] % self.p
+        return acc
     def rand_int(self):
-        return randint(1, self.p - 1)
+        return secrets.randbelow(int(self.p) - 1) + 1
+    def encode(self, x):
+        return int(x).to_bytes((self.p.bit_length() + 7) // 8, "little")
+    def decode(self, data):
+        x = mpz(int.from_bytes(data, "little"))
+        if not 1 < x < self.p - 1:
+            raise ValueError("group element out of range")
+        if self.q is not None and gmpy2.powmod(x, self.q, self.p) != 1:
+            raise ValueError("group element outside the order-q subgroup")
+        return x
     def find_generator(self):
-        factors = sympy.primefactors(self.p-1)
+        factors = _prime_factors(int(self.p))
 
         while True:
             candidate = self.rand_int()
             for factor in factors:
-                if 1 == self.pow(candidate, (self.p -1) // factor):
+                if 1 == gmpy2.powmod(candidate, (self.p -1) // factor, self.p):
                     break
             else:
-                return candidate
\ No newline at end of file
+                return candidate
+
+
+@lru_cache(maxsize=None)
+def modp_group(bits=2048):
+    """
+    Shared RFC 3526 group (1536, 2048, 3072 or 4096 bits); the generator table
+    is kept with it.
+    """
+    return CyclicGroup(p=MODP_PRIMES[bits], g=2)
+
+
+class _PointMul:
+    """
+    fixed_base() for ECGroup: pycryptodome already runs windowed scalar
+    multiplication, so this only keeps the CyclicGroup call shape.
+    """
+    def __init__(self, group, base):
+        self.group = group
+        self.base = base
+    def pow(self, exponent):
+        return self.group.pow(self.base, exponent)
+
+
+class ECGroup:
+    """
+    The prime-order subgroup of Ed25519 behind the CyclicGroup interface,
+    written multiplicatively: mul is point addition, pow is scalar
+    multiplication. Points are pycryptodome EccPoints (C scalar multiplication);
+    encode/decode use the 32-byte RFC 8032 form, and decode rejects anything
+    outside the order-l subgroup, so the cofactor 8 never leaks exponent bits.
+    """
+    p = 2**255 - 19
+    order = 2**252 + 27742317777372353535851937790883648493
+    d = -121665 * pow(121666, -1, 2**255 - 19) % (2**255 - 19)
+    GX = 15112221349535400772501151409588531511454012693041857206046113283949847762202
+    GY = 46316835694926478169428394003475163141307993866256225615783033603165251855960
+    SQRT_M1 = pow(2, (2**255 - 20) // 4, 2**255 - 19)
+
+    def __init__(self):
+        self.generator = EccPoint(self.GX, self.GY, curve="Ed25519")
+        self.identity = self.generator.point_at_infinity()
+    def mul(self, a, b):
+        return a + b
+    def div(self, a, b):
+        return a + (-b)
+    def pow(self, base, exponent):
+        return base * (int(exponent) % self.order)
+    def pow_g(self, exponent):
+        return self.pow(self.generator, exponent)
+    def fixed_base(self, base):
+        return _PointMul(self, base)
+    def multi_pow(self, bases, exponents):
+        acc = self.identity
+        for b, e in zip(bases, exponents):
+            acc = acc + self.pow(b, e)
+        return acc
+    def rand_int(self):
+        return secrets.randbelow(self.order - 1) + 1
+    def encode(self, point):
+        x, y = (int(c) for c in point.xy)
+        return (y | ((x & 1) << 255)).to_bytes(32, "little")
+    def decode(self, data):
+        n = int.from_bytes(data, "little")
+        y, sign = n & ((1 << 255) - 1), n >> 255
+        p = self.p
+        if len(data) != 32 or y >= p:
+            raise ValueError("not an Ed25519 point encoding")
+        u, v = (y * y - 1) % p, (self.d * y * y + 1) % p
+        x = int(u * gmpy2.powmod(v, 3, p) * gmpy2.powmod(u * gmpy2.powmod(v, 7, p), (p - 5) // 8, p) % p)
+        if v * x * x % p != u:
+            x = x * self.SQRT_M1 % p
+        if v * x * x % p != u or (x == 0 and sign):
+            raise ValueError("not an Ed25519 point encoding")
+        if x & 1 != sign:
+            x = p - x
+        point = EccPoint(x, y, curve="Ed25519")
+        if not (point * self.order).is_point_at_infinity():
+            raise ValueError("point is not in the prime-order subgroup")
+        return point
+
+
+if __name__ == "__main__":
+    G = modp_group(2048)
+    x = G.pow_g(secrets.randbelow(int(G.q)))
+    assert G.decode(G.encode(x)) == x
+    # 11 is a quadratic non-residue mod the RFC 3526 2048-bit prime: outside <2>
+    for bad in (11, G.p - 1):
+        try:
+            G.decode(G.encode(bad))
+        except ValueError:
+            continue
+        raise AssertionError(f"decode accepted {bad}")
+    print("MODP subgroup check: PASS")
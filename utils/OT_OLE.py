@@ -1,88 +1,542 @@
-import random
-from GR import GaloisRingElement
-from Party import *
+import os
+import sys
+import base64
+import hashlib
+import secrets
+
+import numpy as np
+from Crypto.Cipher import AES
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+
+from Datetype.GR import GaloisRingElement, GaloisRingVector
+from Network.Party import Party
+from utils.CyclicGroup import ECGroup
+
+
+def _random_words(shape) -> np.ndarray:
+    n = int(np.prod(shape))
+    return np.frombuffer(os.urandom(8 * n), dtype=np.uint64).reshape(shape).copy()
 
 
 class SimulatedOT:
+    """
+    messages_list is either [(m0, m1), ...] of GaloisRingElement, or a pair
+    (m0, m1) of GaloisRingVector for a whole batch; receive_batch answers in
+    the same form.
+    """
 
     def __init__(self, party: Party):
         self.party = party
 
     def send_batch(self, receiver_id, messages_list, round_id):
-        payload = []
-        for m0, m1 in messages_list:
-            payload.append((m0.to_string(), m1.to_string()))
-
-        self.party.send_private(receiver_id, {'t': 'OT_BATCH', 'd': payload}, round_id)
+        if isinstance(messages_list, tuple) and isinstance(messages_list[0], GaloisRingVector):
+            m0, m1 = messages_list
+            payload = {'t': 'OT_BATCH', 'v': [m0.to_string(), m1.to_string()]}
+        else:
+            payload = {'t': 'OT_BATCH', 'd': [(m0.to_string(), m1.to_string()) for m0, m1 in messages_list]}
+        self.party.send_private(receiver_id, payload, round_id)
 
     def receive_batch(self, sender_id, choice_bits, round_id):
+        msgs = self.party.receive_round(round_id, expected_senders=[sender_id])
+        data = msgs[sender_id]
+        if not isinstance(data, dict) or data.get('t') != 'OT_BATCH':
+            raise ValueError(f"Expected an OT batch from {sender_id} in round {round_id}")
 
-        while True:
-            msgs = self.party.receive_round(round_id)
-            if sender_id in msgs and isinstance(msgs[sender_id], dict) and msgs[sender_id].get('t') == 'OT_BATCH':
-                raw_data = msgs[sender_id]['d']
-                break
+        if 'v' in data:
+            m0, m1 = (GaloisRingVector.from_string(s) for s in data['v'])
+            bits = np.asarray(choice_bits, dtype=bool)
+            if len(bits) != len(m0):
+                raise ValueError(f"OT Size Mismatch: expected {len(bits)}, got {len(m0)}")
+            return GaloisRingVector(np.where(bits[:, None], m1.coeffs, m0.coeffs))
 
+        raw_data = data['d']
         if len(raw_data) != len(choice_bits):
             raise ValueError(f"OT Size Mismatch: expected {len(choice_bits)}, got {len(raw_data)}")
-
         results = []
         for (s0, s1), bit in zip(raw_data, choice_bits):
             chosen_str = s1 if bit == 1 else s0
             results.append(GaloisRingElement.from_string(chosen_str))
-
         return results
 
 
+
+def _b64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode('utf-8')
+
+
+def _unb64(s: str, shape) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(s), dtype=np.uint8).reshape(shape)
+
+
+class IKNPOT:
+    """
+    IKNP OT extension: KAPPA base OTs per ordered pair of parties, then any
+    number of OTs for 16 bytes of traffic each plus the masked messages.
+
+    - base OTs: Chou-Orlandi over the Ed25519 prime-order group (32-byte
+      elements; any CyclicGroup-like group can be passed, e.g. modp_group(2048)),
+      run once per peer and role and cached; later batches only advance an AES-CTR nonce
+    - PRG: AES-128-CTR keyed by the base OT keys
+    - hash: fixed-key AES in Matyas-Meyer-Oseas form, pi(x ^ j) ^ x ^ j with
+      the OT index j as tweak, then expanded to the message length with the
+      same construction over a block counter; all batched through one ECB call
+
+    Every message of a batch, base OTs included, travels on the caller's
+    round_id; each step waits for the previous one, so the pair never has two
+    messages of the same round in flight.
+
+    send_batch / receive_batch keep the SimulatedOT interface. send_correlated /
+    receive_correlated give GR correlated OT (m1 = m0 + corr, one message per OT),
+    send_random / receive_random random OT with no message at all.
+    """
+    KAPPA = 128
+    CHUNK = 1 << 16     # OTs per bit-matrix transpose
+    FIXED_KEY = hashlib.sha256(b"OT_OLE fixed-key AES").digest()[:16]
+
+    def __init__(self, party: Party, group=None):
+        self.party = party
+        self.group = group or ECGroup()
+        self._base_as_sender = {}      # peer -> (k0, k1): I extend as OT receiver
+        self._base_as_receiver = {}    # peer -> (s, k_s): I extend as OT sender
+        self._counter = {}
+        self._pi = AES.new(self.FIXED_KEY, AES.MODE_ECB)
+
+    # --- plumbing -------------------------------------------------------
+
+    def _send(self, peer, tag, value, round_id):
+        self.party.send_private(peer, {'t': tag, 'd': value}, round_id)
+
+    def _recv(self, peer, tag, round_id):
+        data = self.party.receive_round(round_id, expected_senders=[peer])[peer]
+        if not isinstance(data, dict) or data.get('t') != tag:
+            raise ValueError(f"Expected {tag} from {peer} in round {round_id}")
+        return data['d']
+
+    def _nonce(self, peer, role) -> bytes:
+        n = self._counter.get((peer, role), 0)
+        self._counter[(peer, role)] = n + 1
+        return n.to_bytes(8, 'little')
+
+    def _key(self, i: int, element) -> bytes:
+        return hashlib.sha256(i.to_bytes(4, 'little') + self.group.encode(element)).digest()[:16]
+
+    # --- base OTs (Chou-Orlandi) ----------------------------------------
+
+    def _base_sender(self, peer, round_id):
+        g = self.group
+        a = secrets.randbits(256)
+        A = g.pow_g(a)
+        self._send(peer, 'BOT_A', g.encode(A).hex(), round_id)
+        Bs = [g.decode(bytes.fromhex(b)) for b in self._recv(peer, 'BOT_B', round_id)]
+        A_a = g.pow(A, a)
+        B_a = [g.pow(B, a) for B in Bs]
+        k0 = [self._key(i, x) for i, x in enumerate(B_a)]
+        k1 = [self._key(i, g.div(x, A_a)) for i, x in enumerate(B_a)]
+        self._base_as_sender[peer] = (k0, k1)
+
+    def _base_receiver(self, peer, round_id):
+        g = self.group
+        A = g.decode(bytes.fromhex(self._recv(peer, 'BOT_A', round_id)))
+        A_table = g.fixed_base(A)
+        s = np.frombuffer(secrets.token_bytes(self.KAPPA // 8), dtype=np.uint8)
+        s_bits = np.unpackbits(s, bitorder='little')
+        Bs, keys = [], []
+        for i in range(self.KAPPA):
+            b = secrets.randbits(256)
+            B = g.pow_g(b)
+            Bs.append(g.encode(g.mul(A, B) if s_bits[i] else B).hex())
+            keys.append(self._key(i, A_table.pow(b)))
+        self._send(peer, 'BOT_B', Bs, round_id)
+        self._base_as_receiver[peer] = (s, keys)
+
+    # --- extension ------------------------------------------------------
+
+    def _prg(self, key: bytes, nonce: bytes, n_bytes: int) -> np.ndarray:
+        stream = AES.new(key, AES.MODE_CTR, nonce=nonce).encrypt(bytes(n_bytes))
+        return np.frombuffer(stream, dtype=np.uint8)
+
+    @classmethod
+    def _transpose(cls, M: np.ndarray, m: int) -> np.ndarray:
+        """
+        KAPPA x (m/8) bytes, column j = OT j -> m x (KAPPA/8) bytes, row j = OT j.
+        """
+        out = np.empty((m, cls.KAPPA // 8), dtype=np.uint8)
+        for start in range(0, m, cls.CHUNK):
+            stop = min(m, start + cls.CHUNK)
+            bits = np.unpackbits(M[:, start // 8:(stop + 7) // 8], axis=1, bitorder='little')[:, :stop - start]
+            out[start:stop] = np.packbits(bits.T, axis=1, bitorder='little')
+        return out
+
+    def _extend_receiver(self, peer, r_bits: np.ndarray, round_id) -> np.ndarray:
+        if peer not in self._base_as_sender:
+            self._base_sender(peer, round_id)
+        k0, k1 = self._base_as_sender[peer]
+        m = len(r_bits)
+        nb = (m + 7) // 8
+        nonce = self._nonce(peer, 'R')
+        r = np.packbits(r_bits.astype(np.uint8), bitorder='little')
+        T = np.stack([self._prg(k, nonce, nb) for k in k0])
+        U = T ^ np.stack([self._prg(k, nonce, nb) for k in k1]) ^ r[None, :]
+        self._send(peer, 'IKNP_U', _b64(U), round_id)
+        return self._transpose(T, m)
+
+    def _extend_sender(self, peer, m: int, round_id):
+        if peer not in self._base_as_receiver:
+            self._base_receiver(peer, round_id)
+        s, keys = self._base_as_receiver[peer]
+        nb = (m + 7) // 8
+        nonce = self._nonce(peer, 'S')
+        U = _unb64(self._recv(peer, 'IKNP_U', round_id), (self.KAPPA, nb))
+        s_bits = np.unpackbits(s, bitorder='little').astype(bool)
+        Q = np.stack([self._prg(k, nonce, nb) for k in keys])
+        Q[s_bits] ^= U[s_bits]
+        return self._transpose(Q, m), s
+
+    def _hash(self, rows: np.ndarray, length: int) -> np.ndarray:
+        """
+        (m, 16) bytes -> (m, length) pads, row j tweaked by j.
+        """
+        m = rows.shape[0]
+        tweak = np.zeros((m, 16), dtype=np.uint8)
+        tweak[:, :8] = np.arange(m, dtype='<u8')[:, None].view(np.uint8)
+        x = rows ^ tweak
+        h = np.frombuffer(self._pi.encrypt(x.tobytes()), dtype=np.uint8).reshape(m, 16) ^ x
+        blocks = -(-length // 16)
+        ctr = np.zeros((blocks, 16), dtype=np.uint8)
+        ctr[:, 8:] = np.arange(blocks, dtype='<u8')[:, None].view(np.uint8)
+        y = (h[:, None, :] ^ ctr[None, :, :]).reshape(-1, 16)
+        pad = np.frombuffer(self._pi.encrypt(y.tobytes()), dtype=np.uint8).reshape(-1, 16) ^ y
+        return pad.reshape(m, blocks * 16)[:, :length]
+
+    # --- OT flavours ----------------------------------------------------
+
+    @staticmethod
+    def _as_bytes(messages_list):
+        if isinstance(messages_list, tuple) and isinstance(messages_list[0], GaloisRingVector):
+            m0, m1 = messages_list
+        else:
+            m0 = GaloisRingVector.from_list([a for a, _ in messages_list])
+            m1 = GaloisRingVector.from_list([b for _, b in messages_list])
+        to_bytes = lambda v: v.coeffs.astype('<u8').view(np.uint8)
+        return to_bytes(m0), to_bytes(m1), isinstance(messages_list, tuple)
+
+    def send_random(self, receiver_id, n: int, round_id, length: int = 16):
+        """
+        Random OT: returns (m0, m1), each (n, length) bytes; nothing is sent.
+        """
+        Q, s = self._extend_sender(receiver_id, n, round_id)
+        return self._hash(Q, length), self._hash(Q ^ s[None, :], length)
+
+    def receive_random(self, sender_id, choice_bits, round_id, length: int = 16) -> np.ndarray:
+        T = self._extend_receiver(sender_id, np.asarray(choice_bits, dtype=np.uint8), round_id)
+        return self._hash(T, length)
+
+    def send_batch(self, receiver_id, messages_list, round_id):
+        m0, m1, vector = self._as_bytes(messages_list)
+        p0, p1 = self.send_random(receiver_id, len(m0), round_id, m0.shape[1])
+        self._send(receiver_id, 'OT_Y', [_b64(m0 ^ p0), _b64(m1 ^ p1), vector], round_id)
+
+    def receive_batch(self, sender_id, choice_bits, round_id):
+        bits = np.asarray(choice_bits, dtype=np.uint8)
+        width = GaloisRingElement.D * 8
+        pad = self.receive_random(sender_id, bits, round_id, width)
+        s0, s1, vector = self._recv(sender_id, 'OT_Y', round_id)
+        y0, y1 = _unb64(s0, (len(bits), width)), _unb64(s1, (len(bits), width))
+        chosen = np.where(bits[:, None].astype(bool), y1, y0) ^ pad
+        out = GaloisRingVector(chosen.view('<u8').astype(np.uint64))
+        return out if vector else list(out)
+
+    def send_correlated(self, receiver_id, correlations: GaloisRingVector, round_id) -> GaloisRingVector:
+        """
+        GR correlated OT: returns m0; the receiver gets m0 + b * corr. One message per OT.
+        """
+        width = GaloisRingElement.D * 8
+        p0, p1 = self.send_random(receiver_id, len(correlations), round_id, width)
+        m0 = p0.view('<u8').astype(np.uint64)
+        tau = m0 + correlations.coeffs - p1.view('<u8').astype(np.uint64)
+        self._send(receiver_id, 'COT', _b64(tau.astype('<u8')), round_id)
+        return GaloisRingVector(m0)
+
+    def receive_correlated(self, sender_id, choice_bits, round_id) -> GaloisRingVector:
+        bits = np.asarray(choice_bits, dtype=np.uint8)
+        width = GaloisRingElement.D * 8
+        pad = self.receive_random(sender_id, bits, round_id, width).view('<u8').astype(np.uint64)
+        tau = _unb64(self._recv(sender_id, 'COT', round_id), (len(bits), width)).view('<u8').astype(np.uint64)
+        return GaloisRingVector(pad + tau * bits[:, None].astype(np.uint64))
+
+
 class GilboaOLE:
+    """
+    OLE over GR(2^64, 64) by bit decomposition: the receiver's delta has
+    D coefficients of K bits, delta = sum_{j,i} b_ji 2^i X^j, so
 
-    def __init__(self, party: Party):
+        x * delta = sum_{j,i} b_ji * ((x X^j) << i)
+
+    and one OT per bit b_ji, with messages (u, u + (x X^j) << i), gives additive
+    shares -sum u and sum t of x * delta. D*K = 4096 OTs per OLE (2 MiB of
+    correlations). The OLEs of a call go through the OT in chunks of at most
+    CHUNK OTs, each chunk's correlations built as NumPy shifts and summed before
+    the next chunk, so memory stays fixed however many OLEs there are. With an
+    OT that offers correlated OT (IKNPOT) only the correction is sent, one GR
+    element per OT instead of two.
+
+    For many values against one fixed delta, FixedDeltaVOLE is far cheaper.
+    """
+
+    CHUNK = 1 << 14  # OTs per OT call: 4 OLEs, 8 MiB of correlations
+
+    def __init__(self, party: Party, ot=None):
         self.party = party
-        self.ot = SimulatedOT(party)
+        self.ot = ot or IKNPOT(party)
         self.K = 64
+        self.D = GaloisRingElement.D
+
+    def _chunks(self, M: int):
+        """
+        OLE ranges [lo, hi) of at most CHUNK OTs each; sender and receiver split alike.
+        """
+        step = max(1, self.CHUNK // (self.D * self.K))
+        return [(lo, min(lo + step, M)) for lo in range(0, M, step)]
+
+    def _x_powers(self, xs: np.ndarray) -> np.ndarray:
+        """
+        (M, D) -> (M, D, D): x * X^j for j < D, by shifting and folding the top
+        coefficient with X^D = -(X^4 + X^3 + X + 1).
+        """
+        out = np.empty((xs.shape[0], self.D, self.D), dtype=np.uint64)
+        y = xs.copy()
+        for j in range(self.D):
+            out[:, j] = y
+            top = y[:, -1].copy()
+            y = np.roll(y, 1, axis=1)
+            y[:, 0] = 0
+            for r in GaloisRingVector._REDUCER:
+                y[:, r] -= top
+        return out
 
-    def _get_scalar_gr(self, val):
-        coeffs = [0] * 64
-        coeffs[0] = val
-        return GaloisRingElement(coeffs)
+    def _correlations(self, xs: np.ndarray) -> np.ndarray:
+        """
+        (M, D) -> (M, D*K, D): entry j*K + i is (x X^j) << i.
+        """
+        shifts = np.arange(self.K, dtype=np.uint64)
+        corr = self._x_powers(xs)[:, :, None, :] << shifts[None, None, :, None]
+        return corr.reshape(xs.shape[0], self.D * self.K, self.D)
+
+    def _choice_bits(self, deltas: np.ndarray) -> np.ndarray:
+        shifts = np.arange(self.K, dtype=np.uint64)
+        bits = (deltas[:, :, None] >> shifts[None, None, :]) & np.uint64(1)
+        return bits.reshape(-1).astype(np.uint8)
+
+    def run_sender_batch(self, receiver_id, xs, round_id) -> GaloisRingVector:
+        if not isinstance(xs, GaloisRingVector):
+            xs = GaloisRingVector.from_list(list(xs))
+        share = np.zeros((len(xs), self.D), dtype=np.uint64)
+        for lo, hi in self._chunks(len(xs)):
+            corr = self._correlations(xs.coeffs[lo:hi])
+            n = (hi - lo) * self.D * self.K
+            if hasattr(self.ot, 'send_correlated'):
+                u = self.ot.send_correlated(receiver_id, GaloisRingVector(corr.reshape(n, self.D)), round_id).coeffs
+                u = u.reshape(corr.shape)
+            else:
+                u = _random_words(corr.shape)
+                self.ot.send_batch(receiver_id, (GaloisRingVector(u.reshape(n, self.D)),
+                                                 GaloisRingVector((u + corr).reshape(n, self.D))), round_id)
+            share[lo:hi] -= u.sum(axis=1, dtype=np.uint64)
+        return GaloisRingVector(share)
+
+    def run_receiver_batch(self, sender_id, deltas, round_id) -> GaloisRingVector:
+        if not isinstance(deltas, GaloisRingVector):
+            deltas = GaloisRingVector.from_list(list(deltas))
+        share = np.zeros((len(deltas), self.D), dtype=np.uint64)
+        for lo, hi in self._chunks(len(deltas)):
+            bits = self._choice_bits(deltas.coeffs[lo:hi])
+            if hasattr(self.ot, 'receive_correlated'):
+                t = self.ot.receive_correlated(sender_id, bits, round_id)
+            else:
+                t = self.ot.receive_batch(sender_id, bits, round_id)
+            share[lo:hi] = t.coeffs.reshape(hi - lo, self.D * self.K, self.D).sum(axis=1, dtype=np.uint64)
+        return GaloisRingVector(share)
 
     def run_sender(self, receiver_id, x_val: GaloisRingElement, round_id) -> GaloisRingElement:
-        u_list = []
-        ot_pairs = []
+        return self.run_sender_batch(receiver_id, [x_val], round_id)[0]
+
+    def run_receiver(self, sender_id, delta_val: GaloisRingElement, round_id) -> GaloisRingElement:
+        return self.run_receiver_batch(sender_id, [delta_val], round_id)[0]
 
 
-        for i in range(self.K):
-            u = GaloisRingElement.random()
-            u_list.append(u)
-            factor = self._get_scalar_gr(1 << i)
-            shift_val = x_val * factor
 
-            m0 = u
-            m1 = u + shift_val
+def _times_x(y: np.ndarray) -> np.ndarray:
+    """
+    (..., D) -> y * X, folding the top coefficient with X^D = -(X^4 + X^3 + X + 1).
+    """
+    top = y[..., -1].copy()
+    out = np.roll(y, 1, axis=-1)
+    out[..., 0] = 0
+    for r in GaloisRingVector._REDUCER:
+        out[..., r] -= top
+    return out
 
-            ot_pairs.append((m0, m1))
 
+class FixedDeltaVOLE:
+    """
+    Vector OLE against a fixed delta per receiver over GR(2^64, 64): the
+    correlated-OT protocol COPE from MASCOT, with gadget g_ji = 2^i X^j.
 
-        self.ot.send_batch(receiver_id, ot_pairs, round_id)
+    Setup, once per pair: one random OT per bit b_ji of delta gives the sender
+    seeds (k0_ji, k1_ji) and the receiver k_{b_ji}. Each later batch of M values
+    expands the seeds with AES-CTR (fresh nonce per batch) and costs one GR
+    correction per bit and value, and no further OT:
 
-        Q = GaloisRingElement([0] * 64)
-        for u in u_list:
-            Q = Q - u
+        u_ji = t0_ji - t1_ji + x          (sent)
+        q_ji = t_{b_ji} + b_ji u_ji = t0_ji + b_ji x
+        sum g_ji q_ji = sum g_ji t0_ji + x * delta
 
-        return Q
+    so the sender keeps -sum g_ji t0_ji. With full_delta=True delta is a uniform
+    GR element (GaloisRingElement.random(), 4096 bits): 4096 corrections of
+    512 B, 2 MiB per value. By default it is the binary lift of a random element
+    of F_{2^64} (one bit per coefficient): 64 corrections, 32 KiB per value.
+    Either way this is far from one GR element per value, which needs an
+    LPN-based (silent) VOLE; that is not implemented here.
 
-    def run_receiver(self, sender_id, delta_val: GaloisRingElement, round_id) -> GaloisRingElement:
+    Corrections go out in messages of at most CHUNK_BYTES, each batch's seed
+    streams expanded chunk by chunk, so memory does not grow with M.
+    """
+
+    CHUNK_BYTES = 1 << 25
+
+    def __init__(self, party: Party, ot=None, full_delta: bool = False):
+        self.party = party
+        self.ot = ot or IKNPOT(party)
+        self.K = GaloisRingElement.K if full_delta else 1
+        self.D = GaloisRingElement.D
+        self.delta = None
+        self._seeds_as_sender = {}      # peer -> (k0, k1)
+        self._seeds_as_receiver = {}    # peer -> (bits, k_b)
+        self._counter = {}
+
+    def generate_delta(self) -> GaloisRingElement:
+        if self.K == GaloisRingElement.K:
+            self.delta = GaloisRingElement.random()
+        else:
+            words = _random_words(self.D) & np.uint64((1 << self.K) - 1)
+            self.delta = GaloisRingElement(words.tolist())
+        return self.delta
+
+    def _bits(self) -> np.ndarray:
+        words = np.array(self.delta.coeffs, dtype=np.uint64)
+        if self.K < 64 and (words >> np.uint64(self.K)).any():
+            raise ValueError(f"delta has more than {self.K} bits per coefficient")
+        shifts = np.arange(self.K, dtype=np.uint64)
+        return ((words[:, None] >> shifts[None, :]) & np.uint64(1)).reshape(-1).astype(np.uint8)
+
+    def _nonce(self, peer, role) -> bytes:
+        n = self._counter.get((peer, role), 0)
+        self._counter[(peer, role)] = n + 1
+        return n.to_bytes(8, 'little')
+
+    def _chunks(self, M: int):
+        """
+        Value ranges [lo, hi) whose corrections fit in CHUNK_BYTES; both sides split alike.
+        """
+        step = max(1, self.CHUNK_BYTES // (self.D * self.K * self.D * 8))
+        return [(lo, min(lo + step, M)) for lo in range(0, M, step)]
+
+    def _expand(self, keys: np.ndarray, nonce: bytes, lo: int, hi: int) -> np.ndarray:
+        """
+        (n, 16) seeds -> (n, hi - lo, D) GR words: values lo..hi-1 of one AES-CTR
+        stream per seed (a value is D * 8 bytes, a whole number of AES blocks).
+        """
+        out = np.empty((len(keys), hi - lo, self.D), dtype=np.uint64)
+        for k, key in enumerate(keys):
+            aes = AES.new(key.tobytes(), AES.MODE_CTR, nonce=nonce, initial_value=lo * self.D // 2)
+            stream = aes.encrypt(bytes((hi - lo) * self.D * 8))
+            out[k] = np.frombuffer(stream, dtype='<u8').reshape(hi - lo, self.D)
+        return out
+
+    def _combine(self, v: np.ndarray) -> np.ndarray:
+        """
+        (D*K, M, D) indexed by (j, i) -> sum_ji (v_ji << i) X^j, Horner in X.
+        """
+        shifts = np.arange(self.K, dtype=np.uint64)
+        w = (v.reshape(self.D, self.K, *v.shape[1:]) << shifts[None, :, None, None]).sum(axis=1, dtype=np.uint64)
+        acc = w[-1]
+        for j in range(self.D - 2, -1, -1):
+            acc = _times_x(acc) + w[j]
+        return acc
+
+    def extend_sender(self, receiver_id, xs, round_id) -> GaloisRingVector:
+        """
+        Share of xs * delta_receiver; the receiver's extend_receiver holds the rest.
+        """
+        if not isinstance(xs, GaloisRingVector):
+            xs = GaloisRingVector.from_list(list(xs))
+        if receiver_id not in self._seeds_as_sender:
+            self._seeds_as_sender[receiver_id] = self.ot.send_random(receiver_id, self.D * self.K, round_id)
+        k0, k1 = self._seeds_as_sender[receiver_id]
+        nonce = self._nonce(receiver_id, 'S')
+        share = np.zeros((len(xs), self.D), dtype=np.uint64)
+        for lo, hi in self._chunks(len(xs)):
+            t0 = self._expand(k0, nonce, lo, hi)
+            u = t0 - self._expand(k1, nonce, lo, hi) + xs.coeffs[None, lo:hi]
+            self.party.send_private(receiver_id, {'t': 'VOLE_U', 'd': _b64(u.astype('<u8'))}, round_id)
+            share[lo:hi] -= self._combine(t0)
+        return GaloisRingVector(share)
 
-        delta_scalar = delta_val.coeffs[0]
-        choice_bits = []
-        for i in range(self.K):
-            bit = (delta_scalar >> i) & 1
-            choice_bits.append(bit)
+    def extend_receiver(self, sender_id, M: int, round_id) -> GaloisRingVector:
+        if self.delta is None:
+            raise RuntimeError("generate_delta() (or set .delta) before receiving a VOLE")
+        if sender_id not in self._seeds_as_receiver:
+            bits = self._bits()
+            self._seeds_as_receiver[sender_id] = (bits, self.ot.receive_random(sender_id, bits, round_id))
+        bits, keys = self._seeds_as_receiver[sender_id]
+        nonce = self._nonce(sender_id, 'R')
+        share = np.empty((M, self.D), dtype=np.uint64)
+        for lo, hi in self._chunks(M):
+            t = self._expand(keys, nonce, lo, hi)
+            data = self.party.receive_round(round_id, expected_senders=[sender_id])[sender_id]
+            if not isinstance(data, dict) or data.get('t') != 'VOLE_U':
+                raise ValueError(f"Expected a VOLE correction from {sender_id} in round {round_id}")
+            u = _unb64(data['d'], (len(bits), hi - lo, self.D * 8)).view('<u8').astype(np.uint64)
+            share[lo:hi] = self._combine(t + u * bits[:, None, None].astype(np.uint64))
+        return GaloisRingVector(share)
 
-        t_shares = self.ot.receive_batch(sender_id, choice_bits, round_id)
 
-        T = GaloisRingElement([0] * 64)
-        for t in t_shares:
-            T = T + t
+if __name__ == "__main__":
+    # node 0 sends, node 1 receives: python utils/OT_OLE.py <node_id>
+    node_id = int(sys.argv[1])
+    party = Party(node_id)
+    party.barrier()
+    ole = GilboaOLE(party)
+    M = 6  # two OT chunks, the second one partial
+    if node_id == 0:
+        xs = GaloisRingVector.random(M)
+        share = ole.run_sender_batch(1, xs, round_id=1)
+        party.send_private(1, [xs.to_string(), share.to_string()], 2)
+    elif node_id == 1:
+        deltas = GaloisRingVector.random(M)
+        share = ole.run_receiver_batch(0, deltas, round_id=1)
+        xs, other = (GaloisRingVector.from_string(s) for s in party.receive_round(2, expected_senders=[0])[0])
+        ok = ((xs * deltas).coeffs == (share + other).coeffs).all()
+        print(f"[{node_id}] GR OLE check: {'PASS' if ok else 'FAIL'}")
 
-        return T
\ No newline at end of file
+    # FixedDeltaVOLE, binary-lift and full delta, two batches each against the same delta;
+    # the full-delta CHUNK_BYTES is shrunk so a batch spans several messages
+    for rid, full in ((10, False), (20, True)):
+        vole = FixedDeltaVOLE(party, ot=ole.ot, full_delta=full)
+        if full:
+            vole.CHUNK_BYTES = 2 * vole.D * vole.K * vole.D * 8
+        for batch, M in enumerate((3, 5)):
+            if node_id == 0:
+                xs = GaloisRingVector.random(M)
+                share = vole.extend_sender(1, xs, rid + batch)
+                party.send_private(1, [xs.to_string(), share.to_string()], rid + 5 + batch)
+            elif node_id == 1:
+                delta = vole.delta or vole.generate_delta()
+                share = vole.extend_receiver(0, M, rid + batch)
+                msg = party.receive_round(rid + 5 + batch, expected_senders=[0])[0]
+                xs, other = (GaloisRingVector.from_string(s) for s in msg)
+                ok = ((xs * delta).coeffs == (share + other).coeffs).all()
+                print(f"[{node_id}] VOLE check (full_delta={full}, batch {batch}): {'PASS' if ok else 'FAIL'}")
@@ -0,0 +1,110 @@
+"""
+Sums of products with a single reduction at the end.
+
+    acc = Accumulator(GaloisRingElement)
+    for a, b in zip(xs, ys):
+        acc.add_product(a, b)
+    total = acc.value()
+
+GR(2^64, 64): products go into a 127-coefficient uint64 buffer as plain
+convolutions (uint64 wraps mod 2^64 for free and reduction by
+x^64 + x^4 + x^3 + x + 1 is linear), so the polynomial reduction runs once.
+Z_2^64 and F_p (p = 2^61 - 1): products are summed as Python ints and reduced
+once.
+"""
+from typing import Union
+
+import numpy as np
+
+from Datetype.GR import GaloisRingElement, GaloisRingVector
+from Datetype.z2k import Z2kElement, Z2kVector
+from Datetype.mersenne61 import Mersenne61, Mersenne61Vector
+
+
+def _gr_row(x) -> np.ndarray:
+    return np.array(x.coeffs, dtype=np.uint64)
+
+
+class Accumulator:
+
+    def __init__(self, elem_type=GaloisRingElement):
+        if elem_type not in (GaloisRingElement, Z2kElement, Mersenne61):
+            raise TypeError(f"no accumulator for {elem_type.__name__}")
+        self.elem_type = elem_type
+        self.reset()
+
+    def reset(self):
+        if self.elem_type is GaloisRingElement:
+            self._buf = np.zeros(2 * GaloisRingElement.D - 1, dtype=np.uint64)
+        else:
+            self._buf = 0
+
+    def add(self, x) -> 'Accumulator':
+        if self.elem_type is GaloisRingElement:
+            self._buf[:GaloisRingElement.D] += _gr_row(x)
+        else:
+            self._buf += x.value
+        return self
+
+    def sub(self, x) -> 'Accumulator':
+        if self.elem_type is GaloisRingElement:
+            self._buf[:GaloisRingElement.D] -= _gr_row(x)
+        else:
+            self._buf -= x.value
+        return self
+
+    def add_product(self, a, b) -> 'Accumulator':
+        """
+        += a * b. With two vectors of the same backend, += their dot product.
+        """
+        if self.elem_type is GaloisRingElement:
+            if isinstance(a, GaloisRingVector):
+                self._buf += GaloisRingVector.convolve_sum(a.coeffs, b.coeffs)
+            else:
+                self._buf += np.convolve(_gr_row(a), _gr_row(b))
+        elif isinstance(a, Z2kVector):
+            self._buf += int((a.values * b.values).sum(dtype=np.uint64))
+        elif isinstance(a, Mersenne61Vector):
+            self._buf += a.dot(b).value
+        else:
+            self._buf += a.value * b.value
+        return self
+
+    def value(self) -> Union[GaloisRingElement, Z2kElement, Mersenne61]:
+        if self.elem_type is GaloisRingElement:
+            reduced = GaloisRingVector._reduce(self._buf.copy()[None, :])
+            return GaloisRingElement(reduced[0].tolist())
+        return self.elem_type(self._buf)
+
+
+def dot(xs, ys):
+    """
+    sum_i xs[i] * ys[i] for two equal-length lists of elements.
+    """
+    if len(xs) != len(ys):
+        raise ValueError("Vector lengths mismatch")
+    if not xs:
+        raise ValueError("empty dot product")
+    acc = Accumulator(type(xs[0]))
+    for a, b in zip(xs, ys):
+        acc.add_product(a, b)
+    return acc.value()
+
+
+if __name__ == "__main__":
+    xs = [GaloisRingElement.random() for _ in range(20)]
+    ys = [GaloisRingElement.random() for _ in range(20)]
+    expected = GaloisRingElement.zero()
+    for a, b in zip(xs, ys):
+        expected = expected + a * b
+    assert dot(xs, ys).coeffs == expected.coeffs
+    acc = Accumulator().add_product(GaloisRingVector.from_list(xs), GaloisRingVector.from_list(ys))
+    assert acc.add(xs[0]).sub(xs[0]).value().coeffs == expected.coeffs
+    print("GR accumulator check: PASS")
+
+    zs = [Z2kElement.random() for _ in range(20)]
+    assert dot(zs, zs) == sum(z.value * z.value for z in zs)
+    assert Accumulator(Z2kElement).add_product(Z2kVector.from_list(zs), Z2kVector.from_list(zs)).value() == dot(zs, zs)
+    ms = [Mersenne61.random() for _ in range(20)]
+    assert dot(ms, ms) == Mersenne61(sum(m.value * m.value for m in ms))
+    print("Z2k / Mersenne61 accumulator check: PASS")
@@ -0,0 +1,238 @@
+"""
+Polynomials over GR(2^64, 64) and interpolation on exceptional sets.
+
+Lagrange interpolation needs x_i - x_j to be invertible for all i != j. In
+GR(2^64, 64) that holds exactly when the x_i are distinct mod 2, i.e. distinct
+in the residue field F_2[x]/(x^64 + x^4 + x^3 + x + 1) = F_{2^64}; such a set
+is called exceptional and can have up to 2^64 elements.
+"""
+from functools import lru_cache
+from typing import List, Union
+
+import numpy as np
+
+from Datetype.GR import GaloisRingElement, GaloisRingVector
+
+
+def binary_lift(k: int) -> GaloisRingElement:
+    """
+    The F_{2^64} element with bit mask k, lifted with 0/1 coefficients.
+    """
+    return GaloisRingElement([(k >> i) & 1 for i in range(GaloisRingElement.D)])
+
+
+def teichmuller_lift(points: GaloisRingVector) -> GaloisRingVector:
+    """
+    T(a) = a^(q^(K-1)), q = 2^64: the unique lift of a mod 2 with T^q = T.
+    K * 63 = 4032 batched squarings for the whole vector.
+    """
+    y = points.coeffs
+    for _ in range(GaloisRingElement.D * (GaloisRingElement.K - 1)):
+        y = GaloisRingVector.mul_arrays(y, y)
+    return GaloisRingVector(y)
+
+
+@lru_cache(maxsize=16)
+def exceptional_set(n: int, lift: str = "binary") -> GaloisRingVector:
+    """
+    n points of GR(2^64, 64) with pairwise unit differences: the lifts of the
+    F_{2^64} elements with bit masks 0..n-1.
+
+    lift="binary" uses 0/1 coefficients (free to build). lift="teichmuller"
+    uses the multiplicatively closed Teichmuller representatives of the same
+    residues (a few seconds to build, then cached).
+    """
+    if n > 1 << 64:
+        raise ValueError("an exceptional set of GR(2^64, 64) has at most 2^64 elements")
+    points = GaloisRingVector.from_list([binary_lift(k) for k in range(n)])
+    if lift == "binary":
+        return points
+    if lift == "teichmuller":
+        return teichmuller_lift(points)
+    raise ValueError(f"unknown lift {lift!r}")
+
+
+def _product(v: GaloisRingVector) -> GaloisRingElement:
+    """
+    Product of all entries by a balanced tree of batched multiplications.
+    """
+    a = v.coeffs
+    if len(a) == 0:
+        return GaloisRingElement.one()
+    while len(a) > 1:
+        if len(a) % 2:
+            a = np.concatenate((GaloisRingVector.mul_arrays(a[0:1], a[1:2]), a[2:]))
+            continue
+        a = GaloisRingVector.mul_arrays(a[0::2], a[1::2])
+    return GaloisRingElement(a[0].tolist())
+
+
+class GRPolynomial:
+    """
+    sum_k coeffs[k] * X^k with GaloisRingElement coefficients, lowest degree first.
+    """
+
+    def __init__(self, coeffs: Union[GaloisRingVector, List[GaloisRingElement]]):
+        if not isinstance(coeffs, GaloisRingVector):
+            coeffs = GaloisRingVector.from_list(list(coeffs))
+        self.coeffs = coeffs
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    @property
+    def degree(self) -> int:
+        nz = np.flatnonzero(self.coeffs.coeffs.any(axis=1))
+        return int(nz[-1]) if len(nz) else -1
+
+    def __call__(self, x: GaloisRingElement) -> GaloisRingElement:
+        return self.evaluate_batch(GaloisRingVector.from_list([x]))[0]
+
+    def evaluate_batch(self, points: GaloisRingVector) -> GaloisRingVector:
+        """
+        Horner at all points at once: deg batched multiplications.
+        """
+        acc = np.zeros_like(points.coeffs)
+        for c in self.coeffs.coeffs[::-1]:
+            acc = GaloisRingVector.mul_arrays(acc, points.coeffs)
+            acc += c
+        return GaloisRingVector(acc)
+
+    def __add__(self, other: 'GRPolynomial') -> 'GRPolynomial':
+        a, b = self.coeffs.coeffs, other.coeffs.coeffs
+        if len(a) < len(b):
+            a, b = b, a
+        out = a.copy()
+        out[:len(b)] += b
+        return GRPolynomial(GaloisRingVector(out))
+
+    def __sub__(self, other: 'GRPolynomial') -> 'GRPolynomial':
+        return self + GRPolynomial(-other.coeffs)
+
+    def __mul__(self, other: 'GRPolynomial') -> 'GRPolynomial':
+        a, b = self.coeffs.coeffs, other.coeffs.coeffs
+        if len(a) == 0 or len(b) == 0:
+            return GRPolynomial(GaloisRingVector.zeros(0))
+        if len(a) > len(b):
+            a, b = b, a
+        out = np.zeros((len(a) + len(b) - 1, GaloisRingElement.D), dtype=np.uint64)
+        for i in range(len(a)):
+            out[i:i + len(b)] += GaloisRingVector.mul_arrays(a[i:i + 1], b)
+        return GRPolynomial(GaloisRingVector(out))
+
+
+class GRDomain:
+    """
+    Interpolation over an exceptional set x_0..x_{n-1} of GR(2^64, 64).
+
+    Barycentric weights w_i = 1 / prod_{j != i} (x_i - x_j) are computed once
+    with batched products and a single batched inversion. The Lagrange
+    coefficients at a point r are LRU-cached, so evaluating further y-vectors
+    at r is one batched product and a sum.
+    """
+    CACHE_SIZE = 256
+
+    def __init__(self, points: GaloisRingVector):
+        residues = np.packbits((points.coeffs & np.uint64(1)).astype(np.uint8), axis=1, bitorder='little')
+        if len({row.tobytes() for row in residues}) != len(points):
+            raise ValueError("points are not an exceptional set (two agree mod 2)")
+        self.points = points
+        n = len(points)
+        one = GaloisRingElement.one()
+        denominators = GaloisRingVector.full(n, one)
+        for j in range(n):
+            diff = points - points[j]
+            diff.coeffs[j] = one.coeffs
+            denominators = denominators * diff
+        self.weights = denominators.inverse()
+        self._cached = lru_cache(maxsize=self.CACHE_SIZE)(self._lagrange_coefficients)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _lagrange_coefficients(self, key: str) -> GaloisRingVector:
+        r = GaloisRingElement.from_string(key)
+        diffs = GaloisRingVector.full(len(self), r) - self.points
+        zero = np.flatnonzero(~diffs.coeffs.any(axis=1))
+        if len(zero):
+            out = GaloisRingVector.zeros(len(self))
+            out.coeffs[zero[0], 0] = 1
+            return out
+        # raises ZeroDivisionError if r is congruent to some x_i mod 2 without being equal
+        return self.weights * diffs.inverse() * _product(diffs)
+
+    def lagrange_coefficients(self, r: GaloisRingElement) -> GaloisRingVector:
+        return self._cached(r.to_string())
+
+    def evaluate(self, ys: Union[GaloisRingVector, List[GaloisRingElement]], r: GaloisRingElement) -> GaloisRingElement:
+        """
+        f(r) for the degree < n polynomial with f(x_i) = ys[i].
+        """
+        if not isinstance(ys, GaloisRingVector):
+            ys = GaloisRingVector.from_list(list(ys))
+        try:
+            return (self.lagrange_coefficients(r) * ys).sum()
+        except ZeroDivisionError:
+            return self.interpolate(ys)(r)
+
+    def interpolate(self, ys: Union[GaloisRingVector, List[GaloisRingElement]]) -> GRPolynomial:
+        """
+        Coefficients of f = sum_i w_i y_i * l(X) / (X - x_i), l = prod (X - x_i);
+        the n synthetic divisions run side by side, one batched step per degree.
+        """
+        if not isinstance(ys, GaloisRingVector):
+            ys = GaloisRingVector.from_list(list(ys))
+        n = len(self)
+        X = self.points.coeffs
+        # l(X) = prod (X - x_i), lowest degree first
+        l = np.zeros((n + 1, GaloisRingElement.D), dtype=np.uint64)
+        l[0, 0] = 1
+        for i in range(n):
+            shifted = np.zeros_like(l)
+            shifted[1:] = l[:-1]
+            shifted -= GaloisRingVector.mul_arrays(X[i:i + 1], l)
+            l = shifted
+        c = (self.weights * ys).coeffs
+        out = np.zeros((n, GaloisRingElement.D), dtype=np.uint64)
+        q = np.zeros_like(X)
+        for k in range(n, 0, -1):
+            q = GaloisRingVector.mul_arrays(q, X)
+            q += l[k]
+            out[k - 1] = GaloisRingVector.mul_arrays(c, q).sum(axis=0, dtype=np.uint64)
+        return GRPolynomial(GaloisRingVector(out))
+
+
+@lru_cache(maxsize=16)
+def gr_domain(n: int, lift: str = "binary") -> GRDomain:
+    """
+    Shared GRDomain on exceptional_set(n, lift).
+    """
+    return GRDomain(exceptional_set(n, lift))
+
+
+if __name__ == "__main__":
+    n = 8
+    D = gr_domain(n)
+    f = GRPolynomial(GaloisRingVector.random(n))
+    ys = f.evaluate_batch(D.points)
+    assert [y.coeffs for y in ys] == [f(x).coeffs for x in D.points]
+
+    g = D.interpolate(ys)
+    assert g.coeffs.coeffs.tolist() == f.coeffs.coeffs.tolist()
+    r = GaloisRingElement.random()
+    assert D.evaluate(ys, r).coeffs == f(r).coeffs
+    assert D.evaluate(ys, D.points[3]).coeffs == ys[3].coeffs
+    print("GR interpolation check: PASS")
+
+    h = f * g
+    assert h(r).coeffs == (f(r) * g(r)).coeffs
+    assert (h - f * g).degree == -1
+    print("GR polynomial arithmetic check: PASS")
+
+    T = exceptional_set(4, "teichmuller")
+    q_power = T.coeffs
+    for _ in range(GaloisRingElement.K):
+        q_power = GaloisRingVector.mul_arrays(q_power, q_power)
+    assert q_power.tolist() == T.coeffs.tolist()
+    assert (T.coeffs & np.uint64(1)).tolist() == (exceptional_set(4).coeffs & np.uint64(1)).tolist()
+    print("Teichmuller lift check: PASS")
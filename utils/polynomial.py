@@ -1,14 +1,354 @@
 # -*- coding: utf-8 -*-
+"""
+Polynomials over F_p as coefficient lists, lowest degree first.
+"""
+
+from random import randint
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+# below these sizes the quadratic algorithms win in pure Python
+KARATSUBA_CUTOFF = 32
+NTT_CUTOFF = 64
+NEWTON_DIV_CUTOFF = 64
+MULTIPOINT_CUTOFF = 32
+
+
+def _trim(a: List[int]) -> List[int]:
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+
+def batch_inverse_mod(values: Sequence[int], module: int) -> List[int]:
+    """
+    Montgomery's trick on plain integers: one pow(.., -1, p) for the whole list.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    prefix = [0] * n
+    acc = 1
+    for i, v in enumerate(values):
+        prefix[i] = acc
+        acc = acc * v % module
+    inv = pow(acc, -1, module)  # ValueError if some value is 0 mod p
+    out = [0] * n
+    for i in range(n - 1, -1, -1):
+        out[i] = inv * prefix[i] % module
+        inv = inv * values[i] % module
+    return out
+
+
+def horner(coefficients: Sequence[int], x: int, module: int) -> int:
+    y = 0
+    for c in reversed(coefficients):
+        y = (y * x + c) % module
+    return y
+
+
+def poly_add(a: Sequence[int], b: Sequence[int], module: int) -> List[int]:
+    if len(a) < len(b):
+        a, b = b, a
+    out = list(a)
+    for i, c in enumerate(b):
+        out[i] = (out[i] + c) % module
+    return _trim(out)
+
+
+def poly_sub(a: Sequence[int], b: Sequence[int], module: int) -> List[int]:
+    return poly_add(a, [(-c) % module for c in b], module)
+
+
+def _schoolbook(a, b, module):
+    out = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                out[i + j] += x * y
+    return [c % module for c in out]
+
+
+def _karatsuba(a, b, module):
+    if min(len(a), len(b)) <= KARATSUBA_CUTOFF:
+        return _schoolbook(a, b, module)
+    n = max(len(a), len(b))
+    size = len(a) + len(b) - 1
+    a, b = a + [0] * (n - len(a)), b + [0] * (n - len(b))
+    h = n // 2
+    a0, a1, b0, b1 = a[:h], a[h:], b[:h], b[h:]
+    z0 = _karatsuba(a0, b0, module)
+    z2 = _karatsuba(a1, b1, module)
+    z1 = _karatsuba([x + y for x, y in zip(a1, a0 + [0])], [x + y for x, y in zip(b1, b0 + [0])], module)
+    out = [0] * (2 * n - 1)
+    for i, c in enumerate(z0):
+        out[i] += c
+        out[i + h] -= c
+    for i, c in enumerate(z2):
+        out[i + 2 * h] += c
+        out[i + h] -= c
+    for i, c in enumerate(z1):
+        out[i + h] += c
+    return [c % module for c in out[:size]]
+
+
+@lru_cache(maxsize=None)
+def ntt_root(module: int, n: int) -> int:
+    """
+    A primitive n-th root of unity mod the prime module, n a power of two.
+    Raises ValueError if n does not divide module - 1.
+    """
+    if n & (n - 1) or (module - 1) % n:
+        raise ValueError(f"{module} has no primitive {n}-th root of unity")
+    # c^((p-1)/n) for a non-residue c has order exactly n
+    for c in range(2, module):
+        if pow(c, (module - 1) // 2, module) == module - 1:
+            return pow(c, (module - 1) // n, module)
+    raise ValueError(f"{module} is not an odd prime")
+
+
+def is_ntt_friendly(module: int, n: int) -> bool:
+    size = 1 << max(0, (n - 1).bit_length())
+    return module > 2 and (module - 1) % size == 0
+
+
+def _transform(a: List[int], root: int, module: int) -> List[int]:
+    n = len(a)
+    a = list(a)
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            a[i], a[j] = a[j], a[i]
+    length = 2
+    while length <= n:
+        w_len = pow(root, n // length, module)
+        half = length // 2
+        ws = [1] * half
+        for k in range(1, half):
+            ws[k] = ws[k - 1] * w_len % module
+        for start in range(0, n, length):
+            for k in range(half):
+                u = a[start + k]
+                v = a[start + k + half] * ws[k] % module
+                a[start + k] = (u + v) % module
+                a[start + k + half] = (u - v) % module
+        length <<= 1
+    return a
+
+
+def ntt(coefficients: Sequence[int], module: int, size: int = None) -> List[int]:
+    """
+    Values at 1, w, ..., w^(size-1) for the primitive size-th root w; size is a
+    power of two (default: the next one >= len) dividing module - 1.
+    """
+    size = size or 1 << max(0, (len(coefficients) - 1).bit_length())
+    a = [c % module for c in coefficients] + [0] * (size - len(coefficients))
+    return _transform(a, ntt_root(module, size), module)
+
+
+def intt(values: Sequence[int], module: int) -> List[int]:
+    n = len(values)
+    a = _transform(list(values), pow(ntt_root(module, n), -1, module), module)
+    n_inv = pow(n, -1, module)
+    return [c * n_inv % module for c in a]
+
+
+def poly_mul(a: Sequence[int], b: Sequence[int], module: int) -> List[int]:
+    """
+    NTT when module is NTT-friendly for the product size, Karatsuba otherwise.
+    """
+    if not a or not b:
+        return []
+    n = len(a) + len(b) - 1
+    if min(len(a), len(b)) > NTT_CUTOFF and is_ntt_friendly(module, n):
+        size = 1 << (n - 1).bit_length()
+        fa, fb = ntt(a, module, size), ntt(b, module, size)
+        return _trim(intt([x * y % module for x, y in zip(fa, fb)], module)[:n])
+    return _trim(_karatsuba(list(a), list(b), module))
+
+
+def poly_inverse(a: Sequence[int], k: int, module: int) -> List[int]:
+    """
+    a^(-1) mod x^k by Newton iteration g <- g * (2 - a * g); a[0] must be invertible.
+    """
+    g = [pow(a[0], -1, module)]
+    m = 1
+    while m < k:
+        m = min(2 * m, k)
+        e = poly_mul(list(a[:m]), g, module)[:m]
+        e = [(-c) % module for c in e] + [0] * (m - len(e))
+        e[0] = (e[0] + 2) % module
+        g = poly_mul(g, e, module)[:m]
+    return g + [0] * (k - len(g))
+
+
+def poly_divmod(a: Sequence[int], b: Sequence[int], module: int) -> Tuple[List[int], List[int]]:
+    a, b = _trim([c % module for c in a]), _trim([c % module for c in b])
+    if not b:
+        raise ZeroDivisionError("polynomial division by zero")
+    if len(a) < len(b):
+        return [], a
+    m = len(a) - len(b) + 1
+    if m <= NEWTON_DIV_CUTOFF or len(b) <= NEWTON_DIV_CUTOFF:
+        r = list(a)
+        lead_inv = pow(b[-1], -1, module)
+        q = [0] * m
+        for i in range(m - 1, -1, -1):
+            c = r[i + len(b) - 1] * lead_inv % module
+            q[i] = c
+            if c:
+                for j, y in enumerate(b):
+                    r[i + j] = (r[i + j] - c * y) % module
+        return _trim(q), _trim(r[:len(b) - 1])
+    # rev(q) = rev(a) / rev(b) mod x^m
+    q = poly_mul(a[::-1][:m], poly_inverse(b[::-1], m, module), module)[:m]
+    q = _trim((q + [0] * (m - len(q)))[::-1])
+    return q, poly_sub(a, poly_mul(b, q, module), module)[:len(b) - 1]
+
+
+def _subproduct_tree(xs, module):
+    level = [[(-x) % module, 1] for x in xs]
+    tree = [level]
+    while len(level) > 1:
+        level = [poly_mul(level[i], level[i + 1], module) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        tree.append(level)
+    return tree
+
+
+def multipoint_eval(coefficients: Sequence[int], xs: Sequence[int], module: int) -> List[int]:
+    """
+    f(x) for all x in xs: Horner for few points, remainder tree otherwise.
+    """
+    if len(xs) <= MULTIPOINT_CUTOFF:
+        return [horner(coefficients, x, module) for x in xs]
+    tree = _subproduct_tree(xs, module)
+    rems = [poly_divmod(coefficients, tree[-1][0], module)[1]]
+    for level in reversed(tree[:-1]):
+        rems = [poly_divmod(rems[i // 2], node, module)[1] for i, node in enumerate(level)]
+    return [r[0] if r else 0 for r in rems]
+
+
+def barycentric_weights(xs: Sequence[int], module: int) -> List[int]:
+    """
+    w_i = 1 / prod_{j != i} (x_i - x_j), with a single inversion.
+    """
+    denominators = []
+    for i, xi in enumerate(xs):
+        d = 1
+        for j, xj in enumerate(xs):
+            if i != j:
+                d = d * (xi - xj) % module
+        denominators.append(d)
+    return batch_inverse_mod(denominators, module)
+
+
+def barycentric_eval(xs: Sequence[int], ys: Sequence[int], weights: Sequence[int], x: int, module: int) -> int:
+    """
+    f(x) = l(x) * sum_i w_i y_i / (x - x_i), l(x) = prod (x - x_i).
+    """
+    x %= module
+    diffs = []
+    for xi, yi in zip(xs, ys):
+        if (x - xi) % module == 0:
+            return yi % module
+        diffs.append((x - xi) % module)
+    inv = batch_inverse_mod(diffs, module)
+    l_x = 1
+    for d in diffs:
+        l_x = l_x * d % module
+    s = 0
+    for w, y, v in zip(weights, ys, inv):
+        s += w * y % module * v
+    return l_x * s % module
+
+
+def interpolate(xs: Sequence[int], ys: Sequence[int], module: int, weights: Sequence[int] = None) -> List[int]:
+    """
+    Coefficients of the degree < n polynomial through (xs, ys):
+    sum_i w_i y_i * l(x) / (x - x_i), each quotient by synthetic division.
+    """
+    n = len(xs)
+    if weights is None:
+        weights = barycentric_weights(xs, module)
+    l = [1]
+    for x in xs:
+        l = [0] + l
+        for i in range(len(l) - 1):
+            l[i] = (l[i] - x * l[i + 1]) % module
+    out = [0] * n
+    for xi, yi, w in zip(xs, ys, weights):
+        c = w * yi % module
+        if not c:
+            continue
+        # l(x) / (x - xi), top coefficient down
+        q = 0
+        for k in range(n, 0, -1):
+            q = (l[k] + q * xi) % module
+            out[k - 1] += c * q
+    return [c % module for c in out]
+
+
+class EvaluationDomain:
+    """
+    Fixed interpolation points x_0..x_{n-1} over F_p.
+
+    The barycentric weights w_i = 1 / prod_{j != i} (x_i - x_j) are computed once
+    (one batched inversion). For a point x the Lagrange coefficients
+    L_i(x) = l(x) * w_i / (x - x_i) cost one more batched inversion and are kept
+    in an LRU cache, so evaluating any y-vector at a seen point is an O(n) dot
+    product with no inversion. Use domain() to share instances.
+    """
+    CACHE_SIZE = 256
+
+    def __init__(self, xs: Sequence[int], module: int):
+        self.module = module
+        self.xs = tuple(x % module for x in xs)
+        if len(set(self.xs)) != len(self.xs):
+            raise ValueError("interpolation points must be distinct mod p")
+        self.weights = barycentric_weights(self.xs, module)
+        self.lagrange_coefficients = lru_cache(maxsize=self.CACHE_SIZE)(self._lagrange_coefficients)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _lagrange_coefficients(self, x: int) -> Tuple[int, ...]:
+        p = self.module
+        x %= p
+        if x in self.xs:
+            return tuple(int(xi == x) for xi in self.xs)
+        diffs = [(x - xi) % p for xi in self.xs]
+        l_x = 1
+        for d in diffs:
+            l_x = l_x * d % p
+        return tuple(l_x * w % p * v % p for w, v in zip(self.weights, batch_inverse_mod(diffs, p)))
+
+    def evaluate(self, ys: Sequence[int], x: int) -> int:
+        """
+        f(x) for the degree < n polynomial with f(x_i) = ys[i].
+        """
+        return sum(c * y for c, y in zip(self.lagrange_coefficients(x % self.module), ys)) % self.module
+
+    def interpolate(self, ys: Sequence[int]) -> List[int]:
+        return interpolate(self.xs, ys, self.module, self.weights)
+
+
+@lru_cache(maxsize=64)
+def domain(xs: Tuple[int, ...], module: int) -> EvaluationDomain:
+    """
+    Shared EvaluationDomain for the points xs (a tuple) mod module.
+    """
+    return EvaluationDomain(xs, module)
 
-from src.utils.tools import
-from GR import GaloisRingElement as galois
 
 class poly:
     # the functions are defined over F_p
-    module =0
-    coefficients = []
-
-    def __init__(self,coefficients,module):
+    def __init__(self, coefficients, module):
         self.module = module
         self.coefficients = [x % module for x in coefficients]
 
@@ -17,7 +357,23 @@ class poly:
         return self.coefficients
     @coef.setter
     def coef(self, coef):
-        self.coefficients =[x % self.module for x in coef]
+        self.coefficients = [x % self.module for x in coef]
+
+    def __call__(self, x):
+        return horner(self.coefficients, x, self.module)
+
+    def __add__(self, other):
+        return poly(poly_add(self.coefficients, other.coefficients, self.module), self.module)
+
+    def __sub__(self, other):
+        return poly(poly_sub(self.coefficients, other.coefficients, self.module), self.module)
+
+    def __mul__(self, other):
+        return poly(poly_mul(self.coefficients, other.coefficients, self.module), self.module)
+
+    def __divmod__(self, other):
+        q, r = poly_divmod(self.coefficients, other.coefficients, self.module)
+        return poly(q, self.module), poly(r, self.module)
 
     @staticmethod
     def random_polynomial(degree, intercept, module):
@@ -34,15 +390,8 @@ class poly:
     @staticmethod
     def get_polynomial_points(coefficients, x, module):
         """ Return the value on x
-            [ (x, f(x))]
         """
-        y = coefficients[0]
-        for i in range(1, len(coefficients)):
-            exponentiation = (x ** i) % module
-            term = (coefficients[i] * exponentiation) % module
-            y = (y + term) % module
-        return y
-
+        return horner(coefficients, x, module)
 
     @staticmethod
     def lagrange_interpolation_x(points, module, x):
@@ -51,33 +400,18 @@ class poly:
         points= [(x1,f(x1)),(x2,f(x2))...]
         :return: f_x
         """
-        x_values,y_values = zip(*points)
-        n = len(points)
-        f_x = 0
-        for i in range(n):
-            numerator, denominator = 1, 1
-            for j in range(n):
-                if i == j:
-                    continue
-                numerator = (numerator * (x - x_values[j])) % module
-                denominator = (denominator * (x_values[i] - x_values[j])) % module
-            lagrange_polynomial = numerator * mod_inverse(denominator, module)
-            f_x = (module + f_x + (y_values[i] * lagrange_polynomial)) % module
-        return f_x
-
-# The following funcs use lib which are slow.
+        x_values, y_values = zip(*points)
+        return domain(tuple(x_values), module).evaluate(y_values, x)
+
     @staticmethod
-    def lagrange_interpolation(points,module):
+    def lagrange_interpolation(points, module):
         """
         :param points: points= [(x1,f(x1)),(x2,f(x2))...]
         :param module: a prime
         :return: coef(list)
         """
-        gf = galois.GF(module)
-        x_values,y_values = zip(*points)
-        a = galois.lagrange_poly(gf(x_values), gf(y_values))
-        print("the poly is :"+str(a))
-        return a.coefficients(order="asc").tolist()
+        x_values, y_values = zip(*points)
+        return domain(tuple(x_values), module).interpolate(y_values)
 
     @staticmethod
     def NTT(coef, size=None, module=None):
@@ -88,63 +422,107 @@ class poly:
             for g(x)*f(x) , N>= deg(g)+deg(f)+1
         module = m * N + 1
         :return: values
-
         """
-        return galois.ntt(coef,size,module).tolist()
+        size = size or 1 << max(0, (len(coef) - 1).bit_length())
+        return ntt(coef, module or poly.ntt_prime(size), size)
 
     @staticmethod
-    def INTT(values,size=None, module=None):
+    def INTT(values, size=None, module=None):
         """
         Computes the Inverse Number-Theoretic Transform (INTT)
         :input: values
         :return: coef
         """
-        return galois.intt(values,size,module).tolist()
+        size = size or len(values)
+        values = list(values) + [0] * (size - len(values))
+        return intt(values, module or poly.ntt_prime(size))
 
+    @staticmethod
+    def ntt_prime(size):
+        """
+        Smallest prime m * size + 1, the default modulus of NTT/INTT.
+        """
+        m = 1
+        while True:
+            p = m * size + 1
+            if p > 2 and all(p % d for d in range(2, int(p ** 0.5) + 1)):
+                return p
+            m += 1
 
-#-------Operations for polynomial ring are below------------
     @staticmethod
-    def modpoly_inverse(cof,modpoly):
-        pass
+    def multipoint_evaluation(coefficients, xs, module):
+        return multipoint_eval(coefficients, xs, module)
+
+#-------Operations for polynomial ring are below------------
     @staticmethod
-    def mod_poly(poly1,poly2,module):
+    def modpoly_inverse(cof, modpoly, module):
         """
-        :param poly1:
-        :param poly2:
-        :param module:
-        :return:
+        cof^(-1) mod modpoly over F_p, by the extended Euclidean algorithm.
         """
-        pass
-        # return cof,poly(cof,module)
+        r0, r1 = _trim([c % module for c in modpoly]), _trim([c % module for c in cof])
+        s0, s1 = [], [1]
+        while r1:
+            q, r = poly_divmod(r0, r1, module)
+            r0, r1 = r1, r
+            s0, s1 = s1, poly_sub(s0, poly_mul(q, s1, module), module)
+        if len(r0) != 1:
+            raise ValueError("polynomial is not invertible modulo modpoly")
+        c = pow(r0[0], -1, module)
+        return poly_divmod([x * c for x in s0], modpoly, module)[1]
 
-#
+    @staticmethod
+    def mod_poly(poly1, poly2, module):
+        """
+        :param poly1: coefficients
+        :param poly2: coefficients of the modulus polynomial
+        :return: (cof, poly(cof, module)) with cof = poly1 mod poly2
+        """
+        cof = poly_divmod(poly1, poly2, module)[1]
+        return cof, poly(cof, module)
 
 
 if __name__ == "__main__":
-
-
+    import random
 
     points_a = [(1, 1), (2, 2), (3, 3), (4, 4), (5, 5)]
-    # points_b = [(1, 2), (2, 3), (3, 4), (4, 5), (5, 6)]
     mod = 131
-    print(poly.lagrange_interpolation_x(points_a,mod,8))
-    # a = poly.lagrange_interpolation(points_a,mod)
-    # b = poly.lagrange_interpolation(points_b, mod)
-    # print(a)
-    # print(b)
-
-    # a = [6,0,10,7,2]
-    # mod = 6*16+1
-    # a_ntt = poly.NTT(a)
-    # print(a_ntt)
-    #
-    # b = [1,0,0,0,1]
-    # b_ntt = poly.NTT(b)
-    # print(b_ntt)
-    # c_ntt = []
-    # for i in range(len(a_ntt)):
-    #     c_ntt.append(a_ntt[i]*b_ntt[i] % 11)
-    # print(c_ntt)
-    # print(poly.INTT(c_ntt))
+    assert poly.lagrange_interpolation_x(points_a, mod, 8) == 8
+    assert poly.lagrange_interpolation(points_a, mod) == [0, 1, 0, 0, 0]
+
+    p = 998244353  # 119 * 2^23 + 1
+    a = [random.randrange(p) for _ in range(300)]
+    b = [random.randrange(p) for _ in range(200)]
+    assert poly_mul(a, b, p) == _trim(_schoolbook(a, b, p))
+    q = 2 ** 61 - 1
+    assert poly_mul(a, b, q) == _trim(_schoolbook(a, b, q))
+    assert poly.INTT(poly.NTT(a[:16], module=p), module=p) == a[:16]
+    print("Multiplication check: PASS")
+
+    quo, rem = poly_divmod(a, b, p)
+    assert poly_add(poly_mul(quo, b, p), rem, p) == _trim(list(a)) and len(rem) < len(b)
+    big = [random.randrange(p) for _ in range(400)]
+    quo, rem = poly_divmod(big, b, p)
+    assert poly_add(poly_mul(quo, b, p), rem, p) == _trim(list(big))
+    inv = poly_inverse(a, 100, p)
+    assert poly_mul(a, inv, p)[:100] == [1] + [0] * 99
+    print("Division / inverse check: PASS")
+
+    xs = random.sample(range(p), 100)
+    assert multipoint_eval(a, xs, p) == [horner(a, x, p) for x in xs]
+    ys = [horner(a[:100], x, p) for x in xs]
+    assert interpolate(xs, ys, p) == a[:100]
+    print("Multipoint / interpolation check: PASS")
 
+    D = domain(tuple(range(1, 33)), p)
+    assert domain(tuple(range(1, 33)), p) is D
+    for _ in range(3):
+        ys = [random.randrange(p) for _ in range(32)]
+        r = random.randrange(p)
+        assert D.evaluate(ys, r) == horner(D.interpolate(ys), r, p) == barycentric_eval(D.xs, ys, D.weights, r, p)
+    assert D.evaluate(ys, 5) == ys[4]
+    print("Evaluation domain check: PASS")
 
+    m = [1, 0, 1, 1]  # x^3 + x^2 + 1, irreducible mod 2
+    f = [1, 1]
+    assert poly.mod_poly(poly_mul(f, poly.modpoly_inverse(f, m, 2), 2), m, 2)[0] == [1]
+    print("Polynomial ring check: PASS")
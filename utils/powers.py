@@ -0,0 +1,127 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from Datetype.GR import GaloisRingElement, GaloisRingVector
+from Datetype.z2k import Z2kElement, Z2kVector
+from Datetype.mersenne61 import Mersenne61, Mersenne61Vector
+
+
+class PowerTable:
+    """
+    Cached tables [1, x, x^2, ..., x^(n-1)] for GR / Z2k / Mersenne61 elements,
+    returned as a GaloisRingVector / Z2kVector / Mersenne61Vector.
+
+    The table is built by doubling: once x^0..x^(k-1) are known, the next block
+    x^k..x^(2k-1) is the whole block 0..k-1 times x^k, one batched product, so
+    the depth is log2(n) vector multiplications.
+
+    The cached arrays are read-only and tables are views of them: copy before
+    updating one in place (e.g. a ShareVector += / *=).
+    """
+
+    MAX_ENTRIES = 128
+
+    _cache = OrderedDict()
+
+    @staticmethod
+    def _key(element):
+        return type(element).__name__, element.to_string()
+
+    @staticmethod
+    def _doubling(out: np.ndarray, x: np.ndarray, mul) -> np.ndarray:
+        """
+        out[0] = 1 on entry; fills out[k] = x^k, block k..2k-1 = block 0..k-1 times x^k.
+        x is a length-1 batch, mul a batched product that broadcasts it.
+        """
+        n = len(out)
+        k = 1
+        step = x  # x^k
+        while k < n:
+            m = min(k, n - k)
+            out[k:k + m] = mul(out[:m], step)
+            k += m
+            step = mul(out[k - 1:k], x)
+        return out
+
+    @classmethod
+    def _build(cls, element, length: int):
+        length = max(length, 0)
+        if isinstance(element, Mersenne61):
+            table = Mersenne61Vector.powers(element, length)
+            table.values.flags.writeable = False
+            return table
+        if isinstance(element, GaloisRingElement):
+            out = np.zeros((length, GaloisRingVector.D), dtype=np.uint64)
+            out[:1, 0] = 1
+            x = np.array(element.coeffs, dtype=np.uint64)[None, :]
+            mul = GaloisRingVector.mul_arrays
+        elif isinstance(element, Z2kElement):
+            out = np.zeros(length, dtype=np.uint64)
+            out[:1] = 1
+            x = np.array([element.value], dtype=np.uint64)
+            mul = np.multiply
+        else:
+            raise TypeError(f"no power table for {type(element).__name__}")
+        cls._doubling(out, x, mul)
+        out.flags.writeable = False
+        return GaloisRingVector(out) if isinstance(element, GaloisRingElement) else Z2kVector(out)
+
+    @classmethod
+    def get(cls, element, length: int):
+        key = cls._key(element)
+        table = cls._cache.get(key)
+        if table is not None and len(table) >= length:
+            cls._cache.move_to_end(key)
+            return table[:length]
+
+        table = cls._build(element, length)
+        cls._cache[key] = table
+        if len(cls._cache) > cls.MAX_ENTRIES:
+            cls._cache.popitem(last=False)
+        return table[:length]
+
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+
+
+def power_table(element, length: int):
+    """
+    [1, x, ..., x^(length-1)], served from the cache when x was seen before.
+    """
+    return PowerTable.get(element, length)
+
+
+if __name__ == "__main__":
+    from Datetype.LinearSecretShare import ShareVector
+
+    a = GaloisRingElement.random()
+    pows = power_table(a, 9)
+    acc = GaloisRingElement.one()
+    for p in pows:
+        assert p.coeffs == acc.coeffs
+        acc = acc * a
+    print("GR power table check: PASS")
+
+    z = Z2kElement.random()
+    assert [p.value for p in power_table(z, 37)] == [pow(z.value, i, 1 << 64) for i in range(37)]
+    print("Z2k power table check: PASS")
+
+    m = Mersenne61.random()
+    assert [p.value for p in power_table(m, 100)] == [pow(m.value, i, Mersenne61.MOD) for i in range(100)]
+    assert power_table(m, 10) == power_table(m, 100)[:10]
+    print("Mersenne61 power table check: PASS")
+
+    # cached tables are read-only, so an in-place update cannot corrupt them
+    for x in (a, z, m):
+        try:
+            share = ShareVector(power_table(x, 4))
+            share *= 3
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("in-place update of a cached power table")
+    assert [p.value for p in power_table(z, 37)] == [pow(z.value, i, 1 << 64) for i in range(37)]
+    assert power_table(a, 0).coeffs.shape == (0, GaloisRingVector.D) and len(power_table(m, 0)) == 0
+    print("read-only cache check: PASS")